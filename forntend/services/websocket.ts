@@ -6,11 +6,16 @@
  * Events follow schema:
  * {
  *   "type": "EVENT_NAME",
- *   "sessionId": "string",
  *   "timestamp": "ISO-8601",
  *   "payload": {},
  *   "meta": { "latency_ms": number, "defcon": number, "cpu_load": string }
  * }
+ *
+ * Events produced by a single command arrive coalesced as
+ * { "batch": [event, event, ...] }.
+ *
+ * Frames carry no sessionId; the connection's own session is filled in
+ * before handlers run.
  */
 
 import { WS_ENDPOINT } from './api';
@@ -21,6 +26,7 @@ export type EventType =
     | 'PAGE_LOADED'
     | 'ACTION_ATTEMPTED'
     | 'ACTION_DECISION'
+    | 'ACTION_RESOLVED'
     | 'THREAT_DETECTED'
     | 'HONEY_PROMPT_TRIGGERED'
     | 'RISK_UPDATE'
@@ -104,17 +110,22 @@ class WebSocketService {
 
                 this.ws.onmessage = (event) => {
                     try {
-                        const data: SentinelEvent = JSON.parse(event.data);
-                        this._lastEvent = data;
+                        const parsed = JSON.parse(event.data);
+                        const events: SentinelEvent[] = Array.isArray(parsed.batch) ? parsed.batch : [parsed];
 
-                        // Update internal state from meta
-                        if (data.meta) {
-                            this._defcon = data.meta.defcon || this._defcon;
-                            this._latency = data.meta.latency_ms || this._latency;
-                        }
+                        for (const data of events) {
+                            data.sessionId ??= this.sessionId ?? '';
+                            this._lastEvent = data;
+
+                            // Update internal state from meta
+                            if (data.meta) {
+                                this._defcon = data.meta.defcon || this._defcon;
+                                this._latency = data.meta.latency_ms || this._latency;
+                            }
 
-                        // Call registered handlers
-                        this.notifyHandlers(data);
+                            // Call registered handlers
+                            this.notifyHandlers(data);
+                        }
                     } catch (e) {
                         console.error('[WS] Failed to parse event:', e);
                     }
@@ -18,7 +18,7 @@ from typing import Optional, Callable, Dict, Any, List
 from dataclasses import dataclass, field
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
 
-from sentinel_backend.models import SessionConfig, SessionState, AgentState, WSEvent, ActionDecision
+from sentinel_backend.models import SessionConfig, SessionState, AgentState, WSEvent, ActionDecision, utc_timestamp
 from sentinel_backend.utils import logger, now_iso, generate_session_id
 from sentinel_backend.honey_prompt import generate_trap_config, check_honeypot_trigger, cleanup_session_traps
 from sentinel_backend.shadow_dom_scanner import ShadowDOMScanner, DOM_EXTRACTION_SCRIPT
@@ -528,7 +528,7 @@ class SecureBrowser:
     async def _emit_event(self, event_type: str, data: Dict[str, Any] = None):
         """Emit event to callback"""
         if self.event_callback:
-            event = WSEvent(type=event_type, data=data or {})
+            event = WSEvent.model_construct(type=event_type, data=data or {}, timestamp=utc_timestamp())
             try:
                 await self.event_callback(event.model_dump())
             except Exception as e:
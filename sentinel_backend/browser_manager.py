@@ -63,6 +63,9 @@ class SecureBrowserSession:
         
         # Threats detected
         self.threats_blocked = 0
+        
+        # Set once stop() has run; later calls are no-ops
+        self._stopped = False
     
     async def start(self):
         """Initialize browser and start screenshot streaming"""
@@ -324,7 +327,10 @@ class SecureBrowserSession:
             })
     
     async def stop(self):
-        """Gracefully stop the browser session"""
+        """Gracefully stop the browser session (safe to call more than once)"""
+        if self._stopped:
+            return
+        self._stopped = True
         self.running = False
         
         try:
@@ -14,121 +14,192 @@ Uses DOM verification (lightweight, no CV/OCR).
 
 import re
 import time
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Set
 from sentinel_backend.models import HallucinationCheck, Severity
 from sentinel_backend.utils import logger, normalize_text
 
 
 # ============================================
-# DOM VERIFICATION
+# WORD BITMASKS
 # ============================================
 
-def verify_element_exists(
-    claimed_selector: str,
-    dom_tree: Dict[str, Any]
-) -> Dict[str, Any]:
+# Shared vocabulary: each distinct word gets one bit position
+_word_id: Dict[str, int] = {}
+_MAX_VOCAB = 4096
+
+
+@lru_cache(maxsize=1024)
+def _word_mask(normalized: str) -> int:
     """
-    Verify if claimed element exists in DOM.
+    Convert normalized text to a bitmask over the shared vocabulary.
     
-    Returns verification result with details.
+    Cached so repeated verifications against the same element text
+    reuse the mask instead of rebuilding word sets.
     """
-    result = {
-        'exists': False,
-        'visible': False,
-        'element': None
-    }
+    mask = 0
+    for word in normalized.split():
+        bit = _word_id.get(word)
+        if bit is None:
+            bit = _word_id[word] = len(_word_id)
+        mask |= 1 << bit
+    return mask
+
+
+def _trim_vocab() -> None:
+    """Reset the vocabulary once it grows past the cap."""
+    if len(_word_id) > _MAX_VOCAB:
+        # Bit positions are reassigned after a reset, so stale masks must go too
+        _word_id.clear()
+        _word_mask.cache_clear()
+
+
+# ============================================
+# DOM INDEX
+# ============================================
+
+MAX_SEARCH_DEPTH = 50
+
+
+@dataclass
+class DOMIndex:
+    """Pre-order flattening of a DOM tree, built once per batch of claims"""
+    nodes: List[Dict[str, Any]] = field(default_factory=list)
+    # Every distinct id/class/tag in the tree, used to reject selectors early
+    keys: Set[str] = field(default_factory=set)
+
+
+def build_dom_index(dom_tree: Dict[str, Any]) -> DOMIndex:
+    """
+    Flatten the DOM into search order (node, children, shadow root).
     
+    Lookups against the index scan a flat list instead of recursing
+    through the tree for every claim.
+    """
+    index = DOMIndex()
     if not dom_tree:
-        return result
-    
-    def search_node(node: Dict[str, Any], depth: int = 0) -> Optional[Dict]:
-        if depth > 50:
-            return None
-        
-        # Check ID match
-        node_id = node.get('id', '')
-        if node_id and (
-            f"#{node_id}" == claimed_selector or 
-            node_id == claimed_selector or
-            node_id in claimed_selector
-        ):
-            return node
+        return index
+    
+    stack = [(dom_tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if depth > MAX_SEARCH_DEPTH:
+            continue
+        index.nodes.append(node)
+        if node:
+            if node_id := node.get('id', ''):
+                index.keys.add(node_id)
+            index.keys.update(node.get('classes', []))
+            index.keys.add(node.get('tag', ''))
         
-        # Check class match
-        classes = node.get('classes', [])
-        for cls in classes:
-            if f".{cls}" == claimed_selector or cls in claimed_selector:
-                return node
-        
-        # Check tag match
-        tag = node.get('tag', '')
-        if tag == claimed_selector or f"{tag}" in claimed_selector:
-            # More specific matching
-            if '[' in claimed_selector:  # Attribute selector
-                attrs = node.get('attributes', {})
-                # Simple attribute check
-                for key, val in attrs.items():
-                    if f'[{key}' in claimed_selector:
-                        return node
-            else:
-                return node
-        
-        # Recurse into children
-        for child in node.get('children', []):
-            found = search_node(child, depth + 1)
-            if found:
-                return found
-        
-        # Check shadow root
+        # Pushed in reverse so children pop before the shadow root
         if shadow := node.get('shadow_root'):
-            found = search_node(shadow, depth + 1)
-            if found:
-                return found
-        
-        return None
+            stack.append((shadow, depth + 1))
+        for child in reversed(node.get('children', [])):
+            stack.append((child, depth + 1))
     
-    element = search_node(dom_tree)
+    return index
+
+
+# ============================================
+# DOM VERIFICATION
+# ============================================
+
+def _node_matches(node: Dict[str, Any], claimed_selector: str) -> bool:
+    """Check a single node against the claimed selector"""
+    # Check ID match (covers "#id" and bare "id")
+    node_id = node.get('id', '')
+    if node_id and node_id in claimed_selector:
+        return True
     
-    if element:
-        result['exists'] = True
-        result['element'] = element
-        
-        # Check visibility
-        style = element.get('style', '') or ''
-        bbox = element.get('bounding_box', {})
+    # Check class match (covers ".cls" and bare "cls")
+    for cls in node.get('classes', []):
+        if cls in claimed_selector:
+            return True
+    
+    # Check tag match
+    tag = node.get('tag', '')
+    if tag in claimed_selector:
+        # More specific matching
+        if '[' in claimed_selector:  # Attribute selector
+            # Simple attribute check
+            for key in node.get('attributes', {}):
+                if f'[{key}' in claimed_selector:
+                    return True
+        else:
+            return True
+    
+    return False
+
+
+def _find_element(
+    claimed_selector: str,
+    dom_tree: Dict[str, Any],
+    index: Optional[DOMIndex] = None
+) -> Optional[Dict[str, Any]]:
+    """Return the first node matching the selector, or None"""
+    if index is None:
+        if not dom_tree:
+            return None
         
-        is_hidden = (
-            'display:none' in style.replace(' ', '') or
-            'visibility:hidden' in style.replace(' ', '') or
-            re.search(r'opacity\s*:\s*0(?:\s|;|$)', style) or
-            (bbox.get('width', 1) == 0 and bbox.get('height', 1) == 0)
-        )
+        def search_node(node: Dict[str, Any], depth: int = 0) -> Optional[Dict]:
+            if depth > MAX_SEARCH_DEPTH:
+                return None
+            
+            if _node_matches(node, claimed_selector):
+                return node
+            
+            # Recurse into children
+            for child in node.get('children', []):
+                found = search_node(child, depth + 1)
+                if found:
+                    return found
+            
+            # Check shadow root
+            if shadow := node.get('shadow_root'):
+                found = search_node(shadow, depth + 1)
+                if found:
+                    return found
+            
+            return None
         
-        result['visible'] = not is_hidden
+        return search_node(dom_tree)
     
-    return result
+    if not any(key in claimed_selector for key in index.keys):
+        # No id, class or tag in the DOM appears in the selector at all
+        return None
+    
+    return next(
+        (node for node in index.nodes if node and _node_matches(node, claimed_selector)),
+        None
+    )
 
 
-def verify_element_text(
+def _is_visible(style: str, bbox: Dict[str, Any]) -> bool:
+    """Check inline style and bounding box for hidden elements"""
+    compact = style.replace(' ', '')
+    is_hidden = (
+        'display:none' in compact or
+        'visibility:hidden' in compact or
+        re.search(r'opacity\s*:\s*0(?:\s|;|$)', style) or
+        (bbox.get('width', 1) == 0 and bbox.get('height', 1) == 0)
+    )
+    return not is_hidden
+
+
+def _compare_text(
     claimed_text: str,
-    element: Dict[str, Any],
+    actual_text: str,
     fuzzy_match: bool = True
 ) -> Dict[str, Any]:
-    """
-    Verify if element contains claimed text.
-    """
+    """Compare claimed text against an element's actual text"""
     result = {
         'matches': False,
-        'actual_text': '',
+        'actual_text': actual_text[:100],
         'similarity': 0.0
     }
     
-    if not element:
-        return result
-    
-    actual_text = element.get('text', '') or ''
-    result['actual_text'] = actual_text[:100]
-    
     if not claimed_text or not actual_text:
         return result
     
@@ -150,32 +221,28 @@ def verify_element_text(
     
     # Fuzzy match (word overlap)
     if fuzzy_match:
-        claimed_words = set(claimed_norm.split())
-        actual_words = set(actual_norm.split())
+        _trim_vocab()
+        claimed_mask = _word_mask(claimed_norm)
+        actual_mask = _word_mask(actual_norm)
         
-        if claimed_words and actual_words:
-            overlap = claimed_words & actual_words
-            similarity = len(overlap) / max(len(claimed_words), len(actual_words))
+        if claimed_mask and actual_mask:
+            overlap = (claimed_mask & actual_mask).bit_count()
+            similarity = overlap / max(claimed_mask.bit_count(), actual_mask.bit_count())
             result['similarity'] = similarity
             result['matches'] = similarity > 0.6  # 60% overlap threshold
     
     return result
 
 
-def verify_element_type(
+def _type_matches(
     claimed_type: str,
-    element: Dict[str, Any]
+    tag: str,
+    classes: List[str],
+    attrs: Dict[str, Any]
 ) -> bool:
-    """
-    Verify if element is of claimed type (button, link, input, etc.)
-    """
-    if not element:
-        return False
-    
-    tag = element.get('tag', '').lower()
-    classes = ' '.join(element.get('classes', [])).lower()
-    attrs = element.get('attributes', {})
-    
+    """Compare claimed element type against the node's tag, classes and attributes"""
+    tag = tag.lower()
+    class_str = ' '.join(classes).lower()
     claimed_lower = claimed_type.lower()
     
     # Direct tag match
@@ -188,12 +255,12 @@ def verify_element_type(
             if tag == 'input':
                 return attrs.get('type', '').lower() in ['button', 'submit']
             return True
-        if 'btn' in classes or 'button' in classes:
+        if 'btn' in class_str or 'button' in class_str:
             return True
     
     # Link variants
     if claimed_lower in ['link', 'anchor']:
-        return tag == 'a' or 'link' in classes
+        return tag == 'a' or 'link' in class_str
     
     # Input variants
     if claimed_lower in ['input', 'textbox', 'text field']:
@@ -206,67 +273,98 @@ def verify_element_type(
     return False
 
 
+def verify_element_exists(
+    claimed_selector: str,
+    dom_tree: Dict[str, Any],
+    index: Optional[DOMIndex] = None
+) -> Dict[str, Any]:
+    """
+    Verify if claimed element exists in DOM.
+    
+    Pass a prebuilt index when checking many selectors against one DOM.
+    Returns verification result with details.
+    """
+    element = _find_element(claimed_selector, dom_tree, index)
+    
+    if not element:
+        return {'exists': False, 'visible': False, 'element': None}
+    
+    return {
+        'exists': True,
+        'visible': _is_visible(element.get('style', '') or '', element.get('bounding_box', {})),
+        'element': element
+    }
+
+
+def verify_element_text(
+    claimed_text: str,
+    element: Dict[str, Any],
+    fuzzy_match: bool = True
+) -> Dict[str, Any]:
+    """
+    Verify if element contains claimed text.
+    """
+    if not element:
+        return {'matches': False, 'actual_text': '', 'similarity': 0.0}
+    
+    return _compare_text(claimed_text, element.get('text', '') or '', fuzzy_match)
+
+
+def verify_element_type(
+    claimed_type: str,
+    element: Dict[str, Any]
+) -> bool:
+    """
+    Verify if element is of claimed type (button, link, input, etc.)
+    """
+    if not element:
+        return False
+    
+    return _type_matches(
+        claimed_type,
+        element.get('tag', ''),
+        element.get('classes', []),
+        element.get('attributes', {})
+    )
+
+
 # ============================================
 # HALLUCINATION DETECTION
 # ============================================
 
-def detect_hallucination(
-    agent_claim: Dict[str, Any],
-    dom_tree: Dict[str, Any]
+def _verify_claim_fused(
+    selector: str,
+    claimed_text: str,
+    claimed_type: str,
+    dom_tree: Dict[str, Any],
+    index: Optional[DOMIndex]
 ) -> HallucinationCheck:
     """
-    Detect if agent claim is a hallucination.
-    
-    Args:
-        agent_claim: What the agent claims about an element
-            - selector: Element selector
-            - text: Claimed text content
-            - element_type: Claimed element type (button, link, etc.)
-            - action: What agent claims it will do
-        dom_tree: Current DOM state
-    
-    Returns:
-        HallucinationCheck with verification results
+    Resolve the claimed element once and run existence, text, type and
+    visibility checks against it, reading each node field a single time.
     """
-    start = time.perf_counter()
-    
-    selector = agent_claim.get('selector', '') or agent_claim.get('target', '')
-    claimed_text = agent_claim.get('text', '')
-    claimed_type = agent_claim.get('element_type', '')
-    
-    # Initialize result
-    result = HallucinationCheck(
-        claimed_element=selector,
-        element_exists=False,
-        element_visible=False,
-        text_matches=False,
-        confidence=0.0,
-        is_hallucination=False,
-        details={}
-    )
-    
-    if not selector:
-        result.is_hallucination = True
-        result.details['error'] = "No selector provided"
-        return result
+    result = HallucinationCheck(claimed_element=selector, details={})
     
     # Step 1: Verify element exists
-    existence = verify_element_exists(selector, dom_tree)
-    result.element_exists = existence['exists']
-    result.element_visible = existence['visible']
-    result.details['existence'] = existence
+    element = _find_element(selector, dom_tree, index)
     
-    if not existence['exists']:
+    if not element:
         result.is_hallucination = True
         result.confidence = 0.9
+        result.details['existence'] = {'exists': False, 'visible': False, 'element': None}
         result.details['reason'] = "Element does not exist in DOM"
         return result
     
-    element = existence['element']
+    tag = element.get('tag', '')
+    visible = _is_visible(element.get('style', '') or '', element.get('bounding_box', {}))
+    
+    result.element_exists = True
+    result.element_visible = visible
+    result.details['existence'] = {'exists': True, 'visible': visible, 'element': element}
     
     # Step 2: Verify text if claimed
     if claimed_text:
-        text_check = verify_element_text(claimed_text, element)
+        text_check = _compare_text(claimed_text, element.get('text', '') or '')
         result.text_matches = text_check['matches']
         result.details['text_verification'] = text_check
         
@@ -277,28 +375,72 @@ def detect_hallucination(
     
     # Step 3: Verify element type if claimed
     if claimed_type:
-        type_matches = verify_element_type(claimed_type, element)
+        type_matches = _type_matches(
+            claimed_type, tag, element.get('classes', []), element.get('attributes', {})
+        )
         result.details['type_matches'] = type_matches
         
         if not type_matches:
             result.is_hallucination = True
             result.confidence = 0.7
-            result.details['reason'] = f"Element type mismatch: claimed {claimed_type}, actual {element.get('tag')}"
+            result.details['reason'] = f"Element type mismatch: claimed {claimed_type}, actual {tag}"
     
     # Step 4: Check visibility
-    if not result.element_visible:
+    if not visible:
         result.details['visibility_warning'] = "Element exists but is not visible"
         result.confidence = max(result.confidence, 0.5)
     
     # Calculate overall confidence
     if not result.is_hallucination:
         confidence_factors = [
-            1.0 if result.element_exists else 0.0,
-            0.8 if result.element_visible else 0.4,
+            1.0,
+            0.8 if visible else 0.4,
             1.0 if result.text_matches else 0.6 if not claimed_text else 0.3
         ]
         result.confidence = sum(confidence_factors) / len(confidence_factors)
     
+    return result
+
+
+def detect_hallucination(
+    agent_claim: Dict[str, Any],
+    dom_tree: Dict[str, Any],
+    index: Optional[DOMIndex] = None
+) -> HallucinationCheck:
+    """
+    Detect if agent claim is a hallucination.
+    
+    Args:
+        agent_claim: What the agent claims about an element
+            - selector: Element selector
+            - text: Claimed text content
+            - element_type: Claimed element type (button, link, etc.)
+            - action: What agent claims it will do
+        dom_tree: Current DOM state
+        index: Optional prebuilt index of dom_tree
+    
+    Returns:
+        HallucinationCheck with verification results
+    """
+    start = time.perf_counter()
+    
+    selector = agent_claim.get('selector', '') or agent_claim.get('target', '')
+    
+    if not selector:
+        return HallucinationCheck(
+            claimed_element=selector,
+            is_hallucination=True,
+            details={'error': "No selector provided"}
+        )
+    
+    result = _verify_claim_fused(
+        selector,
+        agent_claim.get('text', ''),
+        agent_claim.get('element_type', ''),
+        dom_tree,
+        index
+    )
+    
     latency = (time.perf_counter() - start) * 1000
     result.details['latency_ms'] = latency
     
@@ -316,12 +458,14 @@ def verify_agent_claims(
     """
     Verify multiple agent claims against DOM.
     
+    The DOM is flattened once and shared by every claim in the batch.
     Returns list of hallucination check results.
     """
     results = []
+    index = build_dom_index(dom_tree)
     
     for claim in claims:
-        result = detect_hallucination(claim, dom_tree)
+        result = detect_hallucination(claim, dom_tree, index)
         results.append(result)
     
     return results
@@ -13,7 +13,7 @@ This is a canary/tripwire defense strategy.
 
 import time
 import uuid
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, FrozenSet, Sequence, Tuple
 from dataclasses import dataclass, field
 from sentinel_backend.models import HoneypotConfig, HoneypotTrigger, ThreatType, Severity
 from sentinel_backend.utils import logger, generate_trap_id, now_iso
@@ -32,6 +32,11 @@ class HoneyTrap:
     trigger_weight: float  # How suspicious if triggered (0-1)
     element_type: str = "div"
     css_class: str = "sentinel-honey"
+    # Lowercased content words, computed once for text-access checks
+    content_words: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.content_words = frozenset(self.content.lower().split())
 
 
 # Curated trap templates with adversarial content
@@ -89,22 +94,22 @@ class TrapRegistry:
     """
     
     def __init__(self):
-        # session_id -> List of active traps
-        self._traps: Dict[str, List[HoneyTrap]] = {}
+        # session_id -> Snapshot of active traps (rebuilt only on register)
+        self._traps: Dict[str, Tuple[HoneyTrap, ...]] = {}
         # session_id -> List of trigger events
         self._triggers: Dict[str, List[HoneypotTrigger]] = {}
-        # Callbacks for trigger events
-        self._on_trigger_callbacks: List[Callable] = []
+        # Callbacks for trigger events (rebuilt only in on_trigger)
+        self._on_trigger_callbacks: Tuple[Callable, ...] = ()
     
-    def register_traps(self, session_id: str, traps: List[HoneyTrap]):
+    def register_traps(self, session_id: str, traps: Sequence[HoneyTrap]):
         """Register traps for a session"""
-        self._traps[session_id] = traps
+        self._traps[session_id] = tuple(traps)
         self._triggers[session_id] = []
         logger.info(f"[HONEYPOT] Registered {len(traps)} traps for session {session_id}")
     
-    def get_traps(self, session_id: str) -> List[HoneyTrap]:
+    def get_traps(self, session_id: str) -> Tuple[HoneyTrap, ...]:
         """Get active traps for a session"""
-        return self._traps.get(session_id, [])
+        return self._traps.get(session_id, ())
     
     def check_interaction(
         self, 
@@ -117,7 +122,9 @@ class TrapRegistry:
         
         Returns trigger event if honeypot was triggered.
         """
-        traps = self._traps.get(session_id, [])
+        traps = self._traps.get(session_id)
+        if not traps:
+            return None
         
         for trap in traps:
             # Check if element ID matches trap pattern
@@ -157,12 +164,15 @@ class TrapRegistry:
         
         If agent's response/action contains trap text, it was read.
         """
-        traps = self._traps.get(session_id, [])
+        traps = self._traps.get(session_id)
+        if not traps:
+            return None
+        
+        text_words = set(text_content.lower().split())
         
         for trap in traps:
             # Check if trap content appears in agent output
-            trap_words = set(trap.content.lower().split())
-            text_words = set(text_content.lower().split())
+            trap_words = trap.content_words
             
             # If significant overlap with trap content
             overlap = trap_words & text_words
@@ -199,7 +209,7 @@ class TrapRegistry:
     
     def on_trigger(self, callback: Callable):
         """Register callback for trigger events"""
-        self._on_trigger_callbacks.append(callback)
+        self._on_trigger_callbacks = self._on_trigger_callbacks + (callback,)
     
     def cleanup(self, session_id: str):
         """Cleanup traps for a session"""
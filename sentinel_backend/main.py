@@ -12,7 +12,7 @@ Architecture:
 - /ws: WebSocket mission control
 
 WebSocket Events Emitted:
-- PAGE_LOADED, ACTION_ATTEMPTED, ACTION_DECISION
+- PAGE_LOADED, ACTION_ATTEMPTED, ACTION_DECISION, ACTION_RESOLVED
 - THREAT_DETECTED, HONEY_PROMPT_TRIGGERED
 - RISK_UPDATE, TRUST_UPDATE, SESSION_TERMINATED
 - CONFIRMATION_REQUIRED, SCREENSHOT
@@ -28,14 +28,16 @@ Every message includes standardized meta:
 """
 
 import asyncio
+import os
 import time
 import uuid
 from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
+from starlette.websockets import WebSocketState
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from pydantic import BaseModel
 
 # ============================================
@@ -77,6 +79,7 @@ from sentinel_backend.services import (
     metrics_aggregator,
     get_session_metrics,
     get_global_metrics,
+    get_judge_metrics,
     
     # Demo Safety (NEW - Hackathon Reliability)
     demo_safety,
@@ -92,10 +95,18 @@ from sentinel_backend.browser_manager import SecureBrowserSession, session_pool
 # Reporting (PDF)
 from sentinel_backend.reporting import generate_audit_report
 
+# Semantic firewall
+from sentinel_backend.security_modules import assess_action_risk
+
+# Email diagnostics
+from sentinel_backend.utils_email import test_brevo_connection, send_otp_email_async
+
+from sentinel_backend.utils import dumps_json
+
 # ============================================
 # IMPORT AUTH MODULE
 # ============================================
-from sentinel_backend.auth import login as auth_login, signup as auth_signup, LoginRequest, SignupRequest, AuthResponse
+from sentinel_backend.auth import login as auth_login, signup as auth_signup, verify_otp, LoginRequest, SignupRequest, AuthResponse
 
 
 # ============================================
@@ -152,9 +163,12 @@ app = FastAPI(
     version="2.0.0",
     lifespan=lifespan
 )
+_HOME_JSON = dumps_json({"message": "FastAPI running from sentinel_backend folder"}).encode("utf-8")
+
+
 @app.get("/")
 def home():
-    return{"message":"FastAPI running from sentinel_backend folder"}
+    return Response(content=_HOME_JSON, media_type="application/json")
 # Include your existing auth router
 # app.include_router(auth_router)
 
@@ -209,7 +223,6 @@ async def api_verify_otp(request: VerifyOtpRequest):
     """
     Verify OTP endpoint.
     """
-    from sentinel_backend.auth import verify_otp
     if verify_otp(request.email, request.otp):
         return {"success": True, "message": "OTP verified successfully"}
     else:
@@ -242,7 +255,8 @@ async def mission_control(websocket: WebSocket, session_id: str):
     
     # Register WebSocket with orchestrator
     async def send_json(data):
-        await websocket.send_json(data)
+        # Text frame so browsers keep receiving strings, not Blobs
+        await websocket.send_text(dumps_json(data))
     
     ws_orchestrator.register_connection(session_id, send_json)
     
@@ -251,8 +265,8 @@ async def mission_control(websocket: WebSocket, session_id: str):
     trust_engine.initialize_session(session_id)
     metrics_aggregator.initialize_session(session_id)
     
-    # Create secure browser session
-    session = SecureBrowserSession(websocket, session_id)
+    # Create secure browser session (its frames share the session's writer)
+    session = SecureBrowserSession(ws_orchestrator.channel(session_id), session_id)
     browser_sessions[session_id] = session
     
     # Emit connected event
@@ -267,7 +281,10 @@ async def mission_control(websocket: WebSocket, session_id: str):
     try:
         while True:
             data = await websocket.receive_json()
-            await handle_command(session_id, session, data)
+            # Events from one command leave as a single frame; handlers
+            # release it around browser calls (see uncoalesced)
+            async with ws_orchestrator.coalesce(session_id):
+                await handle_command(session_id, session, data)
     
     except WebSocketDisconnect:
         print(f"[WS] Client {session_id} disconnected")
@@ -279,254 +296,286 @@ async def mission_control(websocket: WebSocket, session_id: str):
             data={"reason": str(e), "error": True}
         )
     finally:
-        # Cleanup
-        ws_orchestrator.unregister_connection(session_id)
+        # Cleanup (stop first so SESSION_ENDED is queued before the writer exits)
         browser_sessions.pop(session_id, None)
         await session.stop()
+        writer = ws_orchestrator.unregister_connection(session_id)
+        if writer is not None:
+            await writer
         cleanup_session(session_id)
+        
+        # Server-side endings (KILL_SESSION, errors) still need a close frame
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close()
 
 
-async def handle_command(session_id: str, session: SecureBrowserSession, data: Dict):
-    """Handle incoming WebSocket commands"""
-    cmd = data.get("cmd", "").upper()
-    start_time = time.perf_counter()
-    
-    # NAVIGATE
-    if cmd == "NAVIGATE":
-        url = data.get("url", "")
-        if not url:
-            await ws_orchestrator.emit(
-                EventType.ACTION_DECISION,
-                session_id,
-                data={"decision": "BLOCK", "reason": "URL required"}
-            )
-            return
-        
-        # Emit ACTION_ATTEMPTED
-        await ws_orchestrator.emit_action_attempted(
+# ============================================
+# WEBSOCKET COMMAND HANDLERS
+# ============================================
+
+async def _cmd_navigate(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """NAVIGATE: policy check, then load the page"""
+    url = data.get("url", "")
+    if not url:
+        await ws_orchestrator.emit(
+            EventType.ACTION_DECISION,
             session_id,
-            action_type="NAVIGATE",
-            target=url
+            data={"decision": "BLOCK", "reason": "URL required"}
         )
-        
-        # Policy check
-        policy_result = evaluate_action(
-            {"type": "NAVIGATE", "url": url},
-            {"session_id": session_id}
-        )
-        
-        if policy_result.decision == PolicyDecision.BLOCK:
-            await ws_orchestrator.emit_action_decision(
-                session_id,
-                action_type="NAVIGATE",
-                decision="BLOCK",
-                reason=policy_result.explanation,
-                policy_rule=policy_result.rule_triggered
-            )
-            
-            # Log to forensics
-            forensics_engine.capture_snapshot(
-                session_id,
-                SnapshotType.ACTION,
-                {"type": "NAVIGATE", "url": url, "blocked": True, "reason": policy_result.explanation}
-            )
-            return
-        
-        # Execute navigation
-        await session.navigate(url)
-        latency = int((time.perf_counter() - start_time) * 1000)
-        
-        # Emit PAGE_LOADED
-        await ws_orchestrator.emit_page_loaded(
+        return
+    
+    # Policy check
+    policy_result = evaluate_action(
+        {"type": "NAVIGATE", "url": url},
+        {"session_id": session_id}
+    )
+    
+    if policy_result.decision == PolicyDecision.BLOCK:
+        await ws_orchestrator.emit_action_resolved(
             session_id,
-            url=url,
-            latency_ms=latency
+            action_type="NAVIGATE",
+            target=url,
+            decision="BLOCK",
+            reason=policy_result.explanation,
+            policy_rule=policy_result.rule_triggered
         )
         
-        # Capture to forensics
+        # Log to forensics
         forensics_engine.capture_snapshot(
             session_id,
             SnapshotType.ACTION,
-            {"type": "NAVIGATE", "url": url},
-            url=url
+            {"type": "NAVIGATE", "url": url, "blocked": True, "reason": policy_result.explanation}
         )
+        return
     
-    # CLICK
-    elif cmd == "CLICK":
-        selector = data.get("selector", "")
-        goal = data.get("goal", "")
-        
-        # Emit ACTION_ATTEMPTED
-        await ws_orchestrator.emit_action_attempted(
-            session_id,
-            action_type="CLICK",
-            target=selector,
-            intent=goal
-        )
-        
-        # Semantic firewall check
-        if goal:
-            from security_modules import assess_action_risk
-            semantic_result = await assess_action_risk(goal, f"Click {selector}")
-            
-            if semantic_result.get("risk") == "HIGH":
-                # Calculate risk
-                risk = calculate_risk(
-                    semantic_result={"score": 80, "risk": "HIGH", "reason": semantic_result.get("reason")}
-                )
-                
-                await ws_orchestrator.emit_risk_update(
-                    session_id,
-                    risk.riskScore,
-                    risk.riskLevel.value,
-                    [{"source": "semantic_firewall", "score": 80}]
-                )
-                
-                await ws_orchestrator.emit_action_decision(
-                    session_id,
-                    action_type="CLICK",
-                    decision="CONFIRM",
-                    reason=semantic_result.get("reason")
-                )
-                
-                # Capture to forensics
-                forensics_engine.capture_snapshot(
-                    session_id,
-                    SnapshotType.ACTION,
-                    {"type": "CLICK", "selector": selector, "decision": "CONFIRM"},
-                    risk_score=risk.riskScore
-                )
-                return
-        
-        # Execute click
-        result = await session.click(selector, goal)
-        
-        # Emit decision
-        await ws_orchestrator.emit_action_decision(
-            session_id,
-            action_type="CLICK",
-            decision="ALLOW" if result.get("success") else "FAILED",
-            reason=result.get("error")
-        )
+    # Emit ACTION_ATTEMPTED
+    await ws_orchestrator.emit_action_attempted(
+        session_id,
+        action_type="NAVIGATE",
+        target=url
+    )
     
-    # TYPE
-    elif cmd == "TYPE":
-        selector = data.get("selector", "")
-        text = data.get("text", "")
-        
-        await ws_orchestrator.emit_action_attempted(
-            session_id,
-            action_type="TYPE",
-            target=selector
-        )
-        
-        result = await session.type_text(selector, text)
-        
-        await ws_orchestrator.emit_action_decision(
-            session_id,
-            action_type="TYPE",
-            decision="ALLOW" if result.get("success") else "FAILED"
-        )
+    # Execute navigation (ACTION_ATTEMPTED goes out before the page loads)
+    async with ws_orchestrator.uncoalesced(session_id):
+        await session.navigate(url)
+    latency = (time.perf_counter_ns() - start_ns) // 1_000_000
     
-    # XRAY TOGGLE
-    elif cmd == "XRAY_TOGGLE":
-        xray_result = await session.perform_xray_scan()
+    # Emit PAGE_LOADED
+    await ws_orchestrator.emit_page_loaded(
+        session_id,
+        url=url,
+        latency_ms=latency
+    )
+    
+    # Capture to forensics
+    forensics_engine.capture_snapshot(
+        session_id,
+        SnapshotType.ACTION,
+        {"type": "NAVIGATE", "url": url},
+        url=url
+    )
+
+
+async def _cmd_click(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """CLICK: semantic firewall check when a goal is given, then click"""
+    selector = data.get("selector", "")
+    goal = data.get("goal", "")
+    
+    # Emit ACTION_ATTEMPTED
+    await ws_orchestrator.emit_action_attempted(
+        session_id,
+        action_type="CLICK",
+        target=selector,
+        intent=goal
+    )
+    
+    # Semantic firewall check
+    if goal:
+        semantic_result = await assess_action_risk(goal, f"Click {selector}")
         
-        # If threats found, emit
-        if xray_result and len(xray_result) > 0:
+        if semantic_result.get("risk") == "HIGH":
+            # Calculate risk
             risk = calculate_risk(
-                shadow_dom_result=xray_result
+                semantic_result={"score": 80, "risk": "HIGH", "reason": semantic_result.get("reason")}
             )
             
             await ws_orchestrator.emit_risk_update(
                 session_id,
                 risk.riskScore,
-                risk.riskLevel.value
+                risk.riskLevel.value,
+                [{"source": "semantic_firewall", "score": 80}]
             )
             
-            if risk.riskScore >= 50:
-                await ws_orchestrator.emit_threat_detected(
-                    session_id,
-                    threat_type="hidden_content",
-                    severity=3,
-                    details={"count": len(xray_result)}
-                )
-    
-    # TAKE CONTROL (Human override)
-    elif cmd == "TAKECONTROL":
-        update = trust_engine.handle_human_override(session_id)
-        
-        await ws_orchestrator.emit_trust_update(
-            session_id,
-            update.new_score,
-            event=update.event.value,
-            delta=update.delta
-        )
-        
-        await ws_orchestrator.emit(
-            EventType.HUMAN_CONTROL_GRANTED,
-            session_id,
-            data={"message": "Operator has taken manual control"}
-        )
+            await ws_orchestrator.emit_action_decision(
+                session_id,
+                action_type="CLICK",
+                decision="CONFIRM",
+                reason=semantic_result.get("reason")
+            )
+            
+            # Capture to forensics
+            forensics_engine.capture_snapshot(
+                session_id,
+                SnapshotType.ACTION,
+                {"type": "CLICK", "selector": selector, "decision": "CONFIRM"},
+                risk_score=risk.riskScore
+            )
+            return
     
-    # CONFIRM ACTION
-    elif cmd == "CONFIRM":
-        action_id = data.get("action_id")
-        approved = data.get("approved", False)
-        
-        if approved:
-            # Trust increases when operator approves our decision
-            update = trust_engine.confirm_threat(session_id, action_id)
-        else:
-            # False positive - trust in our detection decreases
-            update = trust_engine.mark_false_positive(session_id, action_id)
-            report_engine.mark_false_positive(session_id, action_id)
-        
-        await ws_orchestrator.emit_trust_update(
-            session_id,
-            update.new_score,
-            event=update.event.value,
-            delta=update.delta
-        )
+    # Execute click
+    async with ws_orchestrator.uncoalesced(session_id):
+        result = await session.click(selector, goal)
     
-    # FEEDBACK
-    elif cmd == "FEEDBACK":
-        threat_id = data.get("threat_id", "")
-        is_false_positive = data.get("false_positive", False)
-        
-        if is_false_positive:
-            update = trust_engine.mark_false_positive(session_id, threat_id)
-            report_engine.mark_false_positive(session_id, threat_id)
-        else:
-            update = trust_engine.confirm_threat(session_id, threat_id)
-        
-        await ws_orchestrator.emit_trust_update(
-            session_id,
-            update.new_score,
-            event=update.event.value,
-            delta=update.delta
-        )
+    # Emit decision
+    await ws_orchestrator.emit_action_decision(
+        session_id,
+        action_type="CLICK",
+        decision="ALLOW" if result.get("success") else "FAILED",
+        reason=result.get("error")
+    )
+
+
+async def _cmd_type(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """TYPE: fill text into an element"""
+    selector = data.get("selector", "")
+    text = data.get("text", "")
     
-    # KILL SESSION
-    elif cmd == "KILL_SESSION":
-        # Generate session stats
-        summary = forensics_engine.get_session_summary(session_id)
+    async with ws_orchestrator.uncoalesced(session_id):
+        result = await session.type_text(selector, text)
+    
+    await ws_orchestrator.emit_action_resolved(
+        session_id,
+        action_type="TYPE",
+        target=selector,
+        decision="ALLOW" if result.get("success") else "FAILED"
+    )
+
+
+async def _cmd_xray_toggle(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """XRAY_TOGGLE: scan for hidden content and report risk"""
+    async with ws_orchestrator.uncoalesced(session_id):
+        xray_result = await session.perform_xray_scan()
+    
+    # If threats found, emit
+    if xray_result and len(xray_result) > 0:
+        risk = calculate_risk(
+            shadow_dom_result=xray_result
+        )
         
-        await ws_orchestrator.emit_session_terminated(
+        await ws_orchestrator.emit_risk_update(
             session_id,
-            reason="User requested termination",
-            stats=summary
+            risk.riskScore,
+            risk.riskLevel.value
         )
         
-        await session.stop()
+        if risk.riskScore >= 50:
+            await ws_orchestrator.emit_threat_detected(
+                session_id,
+                threat_type="hidden_content",
+                severity=3,
+                details={"count": len(xray_result)}
+            )
+
+
+async def _cmd_take_control(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """TAKECONTROL: human override"""
+    update = trust_engine.handle_human_override(session_id)
     
-    # UNKNOWN
+    await ws_orchestrator.emit_trust_update(
+        session_id,
+        update.new_score,
+        event=update.event.value,
+        delta=update.delta
+    )
+    
+    await ws_orchestrator.emit(
+        EventType.HUMAN_CONTROL_GRANTED,
+        session_id,
+        data={"message": "Operator has taken manual control"}
+    )
+
+
+async def _record_feedback(session_id: str, threat_id: str, is_false_positive: bool):
+    """
+    Apply operator feedback to trust and reports, then push the new trust score.
+    
+    Shared by the CONFIRM/FEEDBACK commands and the REST feedback endpoint.
+    """
+    if is_false_positive:
+        # False positive - trust in our detection decreases
+        update = trust_engine.mark_false_positive(session_id, threat_id)
+        report_engine.mark_false_positive(session_id, threat_id)
     else:
+        # Trust increases when operator confirms our decision
+        update = trust_engine.confirm_threat(session_id, threat_id)
+    
+    await ws_orchestrator.emit_trust_update(
+        session_id,
+        update.new_score,
+        event=update.event.value,
+        delta=update.delta
+    )
+    return update
+
+
+async def _cmd_confirm(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """CONFIRM: operator approves or rejects a flagged action"""
+    await _record_feedback(session_id, data.get("action_id"), not data.get("approved", False))
+
+
+async def _cmd_feedback(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """FEEDBACK: operator marks a threat as confirmed or false positive"""
+    await _record_feedback(session_id, data.get("threat_id", ""), data.get("false_positive", False))
+
+
+async def _cmd_kill_session(session_id: str, session: SecureBrowserSession, data: Dict, start_ns: int):
+    """KILL_SESSION: report stats and end the session"""
+    # Generate session stats
+    summary = forensics_engine.get_session_summary(session_id)
+    
+    await ws_orchestrator.emit_session_terminated(
+        session_id,
+        reason="User requested termination",
+        stats=summary
+    )
+    
+    # Leave the receive loop; mission_control's finally stops the browser
+    # and cleans up exactly once
+    raise WebSocketDisconnect(code=1000)
+
+
+# Command name -> handler
+_COMMAND_HANDLERS = {
+    "NAVIGATE": _cmd_navigate,
+    "CLICK": _cmd_click,
+    "TYPE": _cmd_type,
+    "XRAY_TOGGLE": _cmd_xray_toggle,
+    "TAKECONTROL": _cmd_take_control,
+    "CONFIRM": _cmd_confirm,
+    "FEEDBACK": _cmd_feedback,
+    "KILL_SESSION": _cmd_kill_session,
+}
+
+
+async def handle_command(session_id: str, session: SecureBrowserSession, data: Dict):
+    """Handle incoming WebSocket commands"""
+    cmd = data.get("cmd", "")
+    start_ns = time.perf_counter_ns()
+    
+    # Clients normally send canonical uppercase; only normalize on a miss
+    handler = _COMMAND_HANDLERS.get(cmd)
+    if handler is None:
+        cmd = cmd.upper()
+        handler = _COMMAND_HANDLERS.get(cmd)
+    if handler is None:
         await ws_orchestrator.emit(
             EventType.ACTION_DECISION,
             session_id,
             data={"decision": "ERROR", "reason": f"Unknown command: {cmd}"}
         )
+        return
+    
+    await handler(session_id, session, data, start_ns)
 
 
 # ============================================
@@ -702,10 +751,8 @@ async def stop_demo(session_id: str):
     return {"stopped": True}
 
 
-@app.get("/api/demo/page")
-async def demo_page():
-    """Serve demo page with attack patterns"""
-    return HTMLResponse(content="""
+# Static attack playground, encoded once at import
+_DEMO_PAGE_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -772,7 +819,15 @@ async def demo_page():
     </script>
 </body>
 </html>
-""")
+"""
+_DEMO_PAGE_BYTES = _DEMO_PAGE_HTML.encode("utf-8")
+_DEMO_PAGE_HEADERS = {"cache-control": "public, max-age=3600"}
+
+
+@app.get("/api/demo/page")
+async def demo_page():
+    """Serve demo page with attack patterns"""
+    return Response(content=_DEMO_PAGE_BYTES, media_type="text/html", headers=_DEMO_PAGE_HEADERS)
 
 
 # ============================================
@@ -818,7 +873,6 @@ async def get_judge_metrics_endpoint(session_id: str):
     - Latency
     - Interpretability
     """
-    from sentinel_backend.services import get_judge_metrics
     return get_judge_metrics(session_id)
 
 
@@ -841,25 +895,13 @@ async def submit_feedback(
     
     Judges look for this to verify adaptability.
     """
-    from sentinel_backend.services import metrics_aggregator, trust_engine, report_engine
-    
     if feedback.is_false_positive:
-        # Record as false positive
         metrics_aggregator.record_false_positive(session_id)
-        update = trust_engine.mark_false_positive(session_id, feedback.threat_id)
-        report_engine.mark_false_positive(session_id, feedback.threat_id)
     else:
-        # Confirmed threat - record as true positive
         metrics_aggregator.record_true_positive(session_id)
-        update = trust_engine.confirm_threat(session_id, feedback.threat_id)
     
-    # Emit trust update via WebSocket
-    await ws_orchestrator.emit_trust_update(
-        session_id,
-        update.new_score,
-        event=update.event.value,
-        delta=update.delta
-    )
+    # Update trust/report and emit trust update via WebSocket
+    update = await _record_feedback(session_id, feedback.threat_id, feedback.is_false_positive)
     
     return {
         "recorded": True,
@@ -874,9 +916,22 @@ async def submit_feedback(
 # HEALTH & INFO
 # ============================================
 
+# Probes hit /health constantly; rebuild the body at most every 0.5s
+_HEALTH_TTL_S = 0.5
+_health_cache = (0.0, b"")
+
+
 @app.get("/health")
 async def health():
     """Health check with metrics summary"""
+    global _health_cache
+    now = time.monotonic()
+    if now - _health_cache[0] >= _HEALTH_TTL_S:
+        _health_cache = (now, dumps_json(_health_body()).encode("utf-8"))
+    return Response(content=_health_cache[1], media_type="application/json")
+
+
+def _health_body() -> Dict[str, Any]:
     global_metrics = get_global_metrics()
     return {
         "status": "healthy",
@@ -902,19 +957,22 @@ async def health():
     }
 
 
+_ROOT_JSON = dumps_json({
+    "name": "Sentinel Security Backend",
+    "version": "2.0.0",
+    "websocket": "ws://localhost:8000/ws/mission-control/{session_id}",
+    "docs": "/docs",
+    "services": [
+        "riskEngine", "trustEngine", "policyEngine",
+        "forensicsEngine", "wsOrchestrator", "demoEngine", "reportEngine"
+    ]
+}).encode("utf-8")
+
+
 @app.get("/")
 async def root():
     """API info"""
-    return {
-        "name": "Sentinel Security Backend",
-        "version": "2.0.0",
-        "websocket": "ws://localhost:8000/ws/mission-control/{session_id}",
-        "docs": "/docs",
-        "services": [
-            "riskEngine", "trustEngine", "policyEngine",
-            "forensicsEngine", "wsOrchestrator", "demoEngine", "reportEngine"
-        ]
-    }
+    return Response(content=_ROOT_JSON, media_type="application/json")
 
 
 # ============================================
@@ -927,9 +985,6 @@ async def test_smtp_connection():
     Test Brevo API connection.
     Use this to verify Railway environment variables are set correctly.
     """
-    from sentinel_backend.utils_email import test_brevo_connection
-    import os
-    
     # Check if env vars exist
     env_status = {
         "BREVO_API_KEY": "✅ Set" if os.getenv("BREVO_API_KEY") else "❌ Missing",
@@ -954,8 +1009,6 @@ async def send_test_email(email: str = Query(..., description="Email to send tes
     """
     Send a test email to verify full email pipeline.
     """
-    from sentinel_backend.utils_email import send_otp_email_async
-    
     success, message = await send_otp_email_async(email, "123456")
     
     return {
@@ -970,5 +1023,15 @@ async def send_test_email(email: str = Query(..., description="Email to send tes
 # ============================================
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        # uvloop has no Windows build; fall back to the stock loop there
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
+        log_level="info"
+    )
@@ -11,17 +11,189 @@ Features:
 - F1 score calculation
 """
 
+import math
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+from typing import Dict, Iterator, List, Any, Optional, Sequence
 from dataclasses import dataclass, field
 from sentinel_backend.models import SessionMetrics, GlobalMetrics
 from sentinel_backend.utils import logger, now_iso
 
+try:
+    import numpy as np
+except ImportError:
+    # Fallback to a full sort if numpy not available
+    np = None
+
 
 # ============================================
 # METRICS STORE
 # ============================================
 
+# Samples kept per session / latencies kept globally (oldest evicted first)
+SESSION_SAMPLE_WINDOW = 1000
+GLOBAL_LATENCY_WINDOW = 5000
+
+# Max age of a dashboard summary reused while metrics keep changing
+SUMMARY_CACHE_TTL_S = 0.25
+
+# Below this window size a sorted latency index (O(N) insert, O(1)
+# percentile read) is the default; larger windows partition on read
+SORTED_LATENCY_MAX_WINDOW = 2048
+
+
+class SampleRing:
+    """
+    Fixed-size ring of float64 samples with a running sum.
+    
+    Samples live unboxed in one contiguous array('d'); once full, each
+    write overwrites the oldest sample. Unused slots stay 0.0, so the
+    running sum can always subtract the slot being overwritten.
+    """
+    
+    __slots__ = ("_buf", "_size", "_head", "_count", "total")
+    
+    def __init__(self, size: int):
+        self._buf = array('d', bytes(8 * size))
+        self._size = size
+        self._head = 0
+        self._count = 0
+        self.total = 0.0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self) -> Iterator[float]:
+        """Samples from oldest to newest"""
+        if self._count < self._size:
+            return iter(self._buf[:self._count])
+        return iter(self._buf[self._head:] + self._buf[:self._head])
+    
+    def append(self, value: float):
+        head = self._head
+        self.total += value - self._buf[head]
+        self._buf[head] = value
+        self._head = head + 1 if head + 1 < self._size else 0
+        if self._count < self._size:
+            self._count += 1
+    
+    def extend(self, values: List[float]):
+        if len(values) >= self._size:
+            self._buf[:] = array('d', values[-self._size:])
+            self._head = 0
+            self._count = self._size
+            self.total = sum(self._buf)
+            return
+        
+        # At most two contiguous writes: up to the end, then wrapped to the front
+        i = 0
+        while i < len(values):
+            head = self._head
+            chunk = values[i:i + self._size - head]
+            end = head + len(chunk)
+            self.total += sum(chunk) - sum(self._buf[head:end])
+            self._buf[head:end] = array('d', chunk)
+            self._head = end if end < self._size else 0
+            self._count = min(self._count + len(chunk), self._size)
+            i += len(chunk)
+    
+    def samples(self) -> array:
+        """Copy of the stored samples, in storage (not time) order"""
+        return self._buf[:self._count]
+
+
+class SortedSampleRing(SampleRing):
+    """
+    SampleRing that also keeps its samples in a sorted list.
+    
+    Percentile reads index the list directly; each append pays a bisect
+    insert (and delete of the evicted sample), so this suits windows that
+    are read more often than they are written.
+    """
+    
+    __slots__ = ("sorted",)
+    
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.sorted: List[float] = []
+    
+    def append(self, value: float):
+        value = float(value)
+        if self._count == self._size:
+            del self.sorted[bisect_left(self.sorted, self._buf[self._head])]
+        insort(self.sorted, value)
+        super().append(value)
+    
+    def extend(self, values: List[float]):
+        super().extend(values)
+        self.sorted = sorted(self._buf[:self._count])
+
+
+class LatencySketch:
+    """
+    Constant-memory latency histogram with bounded relative error.
+    
+    Log-spaced buckets (DDSketch-style): a value v is counted in bucket
+    ceil(log(v) / log(gamma)) and reported as that bucket's midpoint, which
+    is within relative_accuracy of v. Values below min_value count as 0.
+    Every sample ever added is counted; memory depends only on the range of
+    values (~1000 buckets from 1us to 1000s at 1%), not on how many were
+    recorded. Picklable.
+    """
+    
+    __slots__ = ("relative_accuracy", "min_value", "_gamma", "_log_gamma", "_offset", "_counts", "_zeros", "count")
+    
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        # Dense counts for buckets _offset, _offset + 1, ...
+        self._offset = 0
+        self._counts: List[int] = []
+        self._zeros = 0
+        self.count = 0
+    
+    def add(self, value: float):
+        self.count += 1
+        if value < self.min_value:
+            self._zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        counts = self._counts
+        if not counts:
+            self._offset = key
+        i = key - self._offset
+        if i < 0:
+            counts[:0] = [0] * -i
+            self._offset = key
+            i = 0
+        elif i >= len(counts):
+            counts.extend([0] * (i - len(counts) + 1))
+        counts[i] += 1
+    
+    def extend(self, values: List[float]):
+        for value in values:
+            self.add(value)
+    
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Estimated values at nearest ranks int(count * q)"""
+        # cumulative[j] = samples below bucket j
+        cumulative = list(accumulate(self._counts, initial=self._zeros))
+        results = []
+        for q in qs:
+            rank = int(self.count * q)
+            if rank < self._zeros:
+                results.append(0.0)
+                continue
+            key = self._offset + bisect_right(cumulative, rank) - 1
+            results.append(2 * self._gamma ** key / (self._gamma + 1))
+        return results
+
+
 @dataclass
 class MetricsData:
     """Raw metrics data for a session"""
@@ -34,10 +206,17 @@ class MetricsData:
     false_positives: int = 0
     true_negatives: int = 0
     false_negatives: int = 0
-    latencies: List[float] = field(default_factory=list)
-    risk_scores: List[float] = field(default_factory=list)
+    latencies: SampleRing = field(default_factory=lambda: SampleRing(SESSION_SAMPLE_WINDOW))
+    risk_scores: SampleRing = field(default_factory=lambda: SampleRing(SESSION_SAMPLE_WINDOW))
     start_time: float = field(default_factory=time.time)
     end_time: Optional[float] = None
+    # All-time peak (risk_scores only keeps the recent window)
+    peak_risk: float = 0.0
+
+
+def _as_list(values) -> list:
+    """Plain list from a sequence or numpy array (tolist() unboxes in C)"""
+    return values.tolist() if hasattr(values, "tolist") else list(values)
 
 
 class MetricsEngine:
@@ -48,17 +227,82 @@ class MetricsEngine:
     - Detection accuracy
     - Action decisions
     - Performance (latency)
+    
+    Threading: state shared by all sessions (the session table, running
+    aggregates, global latency window/sketch and summary cache version) is
+    only touched under _global_lock. Per-session MetricsData is updated
+    without it, on the basis that one session's actions are recorded by
+    one task at a time. Under the GIL the lock is uncontended on the event
+    loop; on free-threaded CPython (PEP 703) it is what keeps the ring
+    buffers and counters consistent when handlers run in worker threads.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        sorted_latencies: bool = GLOBAL_LATENCY_WINDOW < SORTED_LATENCY_MAX_WINDOW,
+        latency_sketch: bool = False
+    ):
+        """
+        Args:
+            sorted_latencies: Keep the global latency window sorted on write
+                (cheap percentile reads); off for write-heavy workloads
+            latency_sketch: Serve percentiles from an all-time LatencySketch
+                (~1% error, constant memory) instead of the raw window; the
+                window is still kept for average latency
+        """
         self._sessions: Dict[str, MetricsData] = {}
-        self._global_latencies: List[float] = []
+        self._global_lock = threading.Lock()
+        self._global_latencies = (
+            SortedSampleRing(GLOBAL_LATENCY_WINDOW) if sorted_latencies
+            else SampleRing(GLOBAL_LATENCY_WINDOW)
+        )
+        self._latency_sketch = LatencySketch() if latency_sketch else None
+        
+        # Running aggregates over all tracked sessions (kept in step by the mutators)
+        self._g_total_actions = 0
+        self._g_blocked = 0
+        self._g_threats = 0
+        self._g_tp = 0
+        self._g_fp = 0
+        self._g_fn = 0
+        self._g_tn = 0
+        
+        # Dashboard summary cache: bumped by every mutator
+        self._mut_ver = 0
+        self._summary_cache: Optional[Dict[str, Any]] = None
+        self._summary_cache_ver = -1
+        self._summary_cache_ts = 0.0
     
     def start_session(self, session_id: str):
         """Initialize metrics tracking for a session"""
-        self._sessions[session_id] = MetricsData(session_id=session_id)
+        with self._global_lock:
+            self._mut_ver += 1
+            previous = self._sessions.get(session_id)
+            if previous is not None:
+                self._drop_from_totals(previous)
+            self._sessions[session_id] = MetricsData(session_id=session_id)
         logger.info(f"[METRICS] Started tracking session {session_id}")
     
+    def _session_data(self, session_id: str) -> MetricsData:
+        """Tracked data for a session, created implicitly (not logged) if new"""
+        data = self._sessions.get(session_id)
+        if data is None:
+            with self._global_lock:
+                data = self._sessions.get(session_id)
+                if data is None:
+                    data = self._sessions[session_id] = MetricsData(session_id=session_id)
+        return data
+    
+    def _drop_from_totals(self, data: MetricsData):
+        """Remove a session's counts from the running aggregates (caller holds _global_lock)"""
+        self._g_total_actions -= data.total_actions
+        self._g_blocked -= data.actions_blocked
+        self._g_threats -= data.threats_detected
+        self._g_tp -= data.true_positives
+        self._g_fp -= data.false_positives
+        self._g_fn -= data.false_negatives
+        self._g_tn -= data.true_negatives
+    
     def record_action(
         self,
         session_id: str,
@@ -69,27 +313,75 @@ class MetricsEngine:
         threats_detected: int = 0
     ):
         """Record an action evaluation"""
-        if session_id not in self._sessions:
-            self.start_session(session_id)
+        data = self._session_data(session_id)
         
-        data = self._sessions[session_id]
         data.total_actions += 1
-        
         if allowed:
             data.actions_allowed += 1
         if blocked:
             data.actions_blocked += 1
-        
         data.threats_detected += threats_detected
+        
         data.latencies.append(latency_ms)
         data.risk_scores.append(risk_score)
-        self._global_latencies.append(latency_ms)
+        if risk_score > data.peak_risk:
+            data.peak_risk = risk_score
+        
+        with self._global_lock:
+            self._mut_ver += 1
+            self._g_total_actions += 1
+            if blocked:
+                self._g_blocked += 1
+            self._g_threats += threats_detected
+            self._global_latencies.append(latency_ms)
+            if self._latency_sketch is not None:
+                self._latency_sketch.add(latency_ms)
+    
+    def record_actions_bulk(
+        self,
+        session_id: str,
+        allowed: Sequence[bool],
+        blocked: Sequence[bool],
+        latencies_ms: Sequence[float],
+        risk_scores: Optional[Sequence[float]] = None,
+        threats_detected: Optional[Sequence[int]] = None
+    ):
+        """
+        Record a batch of action evaluations in one call.
+        
+        Equivalent to calling record_action once per element; accepts lists
+        or numpy arrays of equal length.
+        """
+        latencies = _as_list(latencies_ms)
+        n = len(latencies)
+        if not n:
+            with self._global_lock:
+                self._mut_ver += 1
+            return
+        risks = _as_list(risk_scores) if risk_scores is not None else [0.0] * n
+        
+        data = self._session_data(session_id)
+        
+        n_blocked = sum(map(bool, _as_list(blocked)))
+        n_threats = sum(_as_list(threats_detected)) if threats_detected is not None else 0
+        
+        data.total_actions += n
+        data.actions_allowed += sum(map(bool, _as_list(allowed)))
+        data.actions_blocked += n_blocked
+        data.threats_detected += n_threats
+        
+        data.latencies.extend(latencies)
+        data.risk_scores.extend(risks)
+        data.peak_risk = max(data.peak_risk, max(risks))
         
-        # Keep latency lists bounded
-        if len(data.latencies) > 1000:
-            data.latencies = data.latencies[-1000:]
-        if len(self._global_latencies) > 5000:
-            self._global_latencies = self._global_latencies[-5000:]
+        with self._global_lock:
+            self._mut_ver += 1
+            self._g_total_actions += n
+            self._g_blocked += n_blocked
+            self._g_threats += n_threats
+            self._global_latencies.extend(latencies)
+            if self._latency_sketch is not None:
+                self._latency_sketch.extend(latencies)
     
     def record_feedback(
         self,
@@ -100,24 +392,32 @@ class MetricsEngine:
         is_false_negative: bool = False
     ):
         """Record accuracy feedback (from operator)"""
-        if session_id not in self._sessions:
-            return
-        
-        data = self._sessions[session_id]
-        
-        if is_true_positive:
-            data.true_positives += 1
-        if is_false_positive:
-            data.false_positives += 1
-        if is_true_negative:
-            data.true_negatives += 1
-        if is_false_negative:
-            data.false_negatives += 1
+        with self._global_lock:
+            self._mut_ver += 1
+            data = self._sessions.get(session_id)
+            if data is None:
+                return
+            
+            if is_true_positive:
+                data.true_positives += 1
+                self._g_tp += 1
+            if is_false_positive:
+                data.false_positives += 1
+                self._g_fp += 1
+            if is_true_negative:
+                data.true_negatives += 1
+                self._g_tn += 1
+            if is_false_negative:
+                data.false_negatives += 1
+                self._g_fn += 1
     
     def end_session(self, session_id: str):
         """Mark session as ended"""
-        if session_id in self._sessions:
-            self._sessions[session_id].end_time = time.time()
+        with self._global_lock:
+            self._mut_ver += 1
+            data = self._sessions.get(session_id)
+            if data is not None:
+                data.end_time = time.time()
     
     def get_session_metrics(self, session_id: str) -> Optional[SessionMetrics]:
         """Get metrics for a specific session"""
@@ -134,13 +434,14 @@ class MetricsEngine:
         recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
         f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
         
-        # Calculate average latency
-        avg_latency = sum(data.latencies) / len(data.latencies) if data.latencies else 0.0
+        # Average latency over the session's sample window
+        avg_latency = data.latencies.total / len(data.latencies) if data.latencies else 0.0
         
-        # Peak risk
-        peak_risk = max(data.risk_scores) if data.risk_scores else 0.0
+        # Peak risk (all-time; risk_scores only keeps the recent window)
+        peak_risk = float(data.peak_risk)
         
-        return SessionMetrics(
+        # Every field is computed above with its final type; skip validation
+        return SessionMetrics.model_construct(
             session_id=session_id,
             total_actions=data.total_actions,
             actions_allowed=data.actions_allowed,
@@ -157,25 +458,41 @@ class MetricsEngine:
     
     def get_global_metrics(self) -> GlobalMetrics:
         """Get aggregated global metrics"""
-        total_sessions = len(self._sessions)
-        total_actions = sum(d.total_actions for d in self._sessions.values())
-        total_threats = sum(d.threats_detected for d in self._sessions.values())
-        total_blocked = sum(d.actions_blocked for d in self._sessions.values())
+        if not self._sessions and not self._global_latencies:
+            # Fresh engine: nothing recorded yet
+            return GlobalMetrics.model_construct(
+                total_sessions=0,
+                total_actions=0,
+                total_threats_detected=0,
+                total_actions_blocked=0,
+                avg_latency_ms=0.0,
+                precision=0.0,
+                recall=0.0,
+                f1_score=0.0
+            )
         
-        # Aggregate accuracy
-        total_tp = sum(d.true_positives for d in self._sessions.values())
-        total_fp = sum(d.false_positives for d in self._sessions.values())
-        total_fn = sum(d.false_negatives for d in self._sessions.values())
-        total_tn = sum(d.true_negatives for d in self._sessions.values())
+        with self._global_lock:
+            total_sessions = len(self._sessions)
+            total_actions = self._g_total_actions
+            total_threats = self._g_threats
+            total_blocked = self._g_blocked
+            
+            # Aggregate accuracy
+            total_tp = self._g_tp
+            total_fp = self._g_fp
+            total_fn = self._g_fn
+            
+            latency_total = self._global_latencies.total
+            latency_count = len(self._global_latencies)
         
         precision = total_tp / (total_tp + total_fp) if (total_tp + total_fp) > 0 else 0.0
         recall = total_tp / (total_tp + total_fn) if (total_tp + total_fn) > 0 else 0.0
         f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
         
         # Global average latency
-        avg_latency = sum(self._global_latencies) / len(self._global_latencies) if self._global_latencies else 0.0
+        avg_latency = latency_total / latency_count if latency_count else 0.0
         
-        return GlobalMetrics(
+        return GlobalMetrics.model_construct(
             total_sessions=total_sessions,
             total_actions=total_actions,
             total_threats_detected=total_threats,
@@ -188,22 +505,54 @@ class MetricsEngine:
     
     def get_latency_percentiles(self) -> Dict[str, float]:
         """Get latency percentiles"""
-        if not self._global_latencies:
-            return {'p50': 0, 'p90': 0, 'p99': 0}
+        with self._global_lock:
+            n = len(self._global_latencies)
+            if not n:
+                return {'p50': 0, 'p90': 0, 'p99': 0}
+            
+            if self._latency_sketch is not None:
+                p50, p90, p99 = self._latency_sketch.quantiles((0.50, 0.90, 0.99))
+                return {'p50': p50, 'p90': p90, 'p99': p99}
+            
+            # Nearest-rank positions (int(n * q) is already the last index for small n)
+            ranks = (int(n * 0.50), int(n * 0.90), int(n * 0.99))
+            
+            if isinstance(self._global_latencies, SortedSampleRing):
+                sorted_lat = self._global_latencies.sorted
+                return {'p50': sorted_lat[ranks[0]], 'p90': sorted_lat[ranks[1]], 'p99': sorted_lat[ranks[2]]}
+            
+            samples = self._global_latencies.samples()
         
-        sorted_lat = sorted(self._global_latencies)
-        n = len(sorted_lat)
+        if np is not None:
+            # Zero-copy view of the sample copy; partial sort puts only the
+            # three ranks in their sorted position
+            buf = np.frombuffer(samples, dtype=np.float64)
+            buf.partition(sorted(set(ranks)))
+            p50, p90, p99 = (float(buf[k]) for k in ranks)
+        else:
+            sorted_lat = sorted(samples)
+            p50, p90, p99 = (sorted_lat[k] for k in ranks)
         
-        return {
-            'p50': sorted_lat[int(n * 0.50)],
-            'p90': sorted_lat[int(n * 0.90)] if n > 10 else sorted_lat[-1],
-            'p99': sorted_lat[int(n * 0.99)] if n > 100 else sorted_lat[-1]
-        }
+        return {'p50': p50, 'p90': p90, 'p99': p99}
     
     def get_dashboard_summary(self) -> Dict[str, Any]:
-        """Get quick summary for dashboard"""
+        """
+        Get quick summary for dashboard.
+        
+        Reused while nothing has changed, and for up to
+        SUMMARY_CACHE_TTL_S under constant traffic.
+        """
+        now = time.monotonic()
+        if self._summary_cache is not None and (
+            self._summary_cache_ver == self._mut_ver
+            or now - self._summary_cache_ts < SUMMARY_CACHE_TTL_S
+        ):
+            return dict(self._summary_cache)
+        
         global_metrics = self.get_global_metrics()
         percentiles = self.get_latency_percentiles()
+        with self._global_lock:
+            active_sessions = sum(1 for d in self._sessions.values() if d.end_time is None)
         
         # Calculate block rate
         block_rate = (
@@ -211,8 +560,8 @@ class MetricsEngine:
             if global_metrics.total_actions > 0 else 0
         )
         
-        return {
-            'active_sessions': sum(1 for d in self._sessions.values() if d.end_time is None),
+        self._summary_cache = {
+            'active_sessions': active_sessions,
             'total_sessions': global_metrics.total_sessions,
             'total_actions': global_metrics.total_actions,
             'threats_blocked': global_metrics.total_actions_blocked,
@@ -223,10 +572,17 @@ class MetricsEngine:
             'precision': f"{global_metrics.precision:.2f}",
             'recall': f"{global_metrics.recall:.2f}"
         }
+        self._summary_cache_ver = self._mut_ver
+        self._summary_cache_ts = now
+        return dict(self._summary_cache)
     
     def cleanup_session(self, session_id: str):
         """Remove session metrics (optional, for memory management)"""
-        self._sessions.pop(session_id, None)
+        with self._global_lock:
+            self._mut_ver += 1
+            data = self._sessions.pop(session_id, None)
+            if data is not None:
+                self._drop_from_totals(data)
 
 
 # Global metrics engine
@@ -237,20 +593,19 @@ metrics_engine = MetricsEngine()
 # CONVENIENCE FUNCTIONS
 # ============================================
 
+# Bound once; record_action_metrics is called per action
+_record_action = metrics_engine.record_action
+
+
 def record_action_metrics(
     session_id: str,
     allowed: bool,
     latency_ms: float,
-    **kwargs
+    risk_score: float = 0.0,
+    threats_detected: int = 0
 ):
     """Shortcut to record action"""
-    metrics_engine.record_action(
-        session_id=session_id,
-        allowed=allowed,
-        blocked=not allowed,
-        latency_ms=latency_ms,
-        **kwargs
-    )
+    _record_action(session_id, allowed, not allowed, latency_ms, risk_score, threats_detected)
 
 
 def get_session_metrics(session_id: str) -> Optional[SessionMetrics]:
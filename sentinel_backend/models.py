@@ -4,12 +4,19 @@ Sentinel Backend - Pydantic Models
 All data models and schemas for the security framework.
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Literal
+from collections import deque
+from dataclasses import dataclass
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Any, Literal, Deque
 from datetime import datetime
 from enum import Enum
 
 
+def utc_timestamp() -> str:
+    """Current UTC time in ISO format (WSEvent's default timestamp)"""
+    return datetime.utcnow().isoformat()
+
+
 # ============================================
 # ENUMS
 # ============================================
@@ -80,7 +87,7 @@ class WSEvent(BaseModel):
     """Outgoing WebSocket event to frontend"""
     type: str
     data: Optional[Dict[str, Any]] = None
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=utc_timestamp)
 
 
 # ============================================
@@ -185,7 +192,8 @@ class HallucinationCheck(BaseModel):
 # RISK SCORING
 # ============================================
 
-class RiskBreakdown(BaseModel):
+@dataclass(slots=True)
+class RiskBreakdown:
     """Breakdown of risk score by category"""
     prompt_injection: float = 0
     hidden_content: float = 0
@@ -227,7 +235,8 @@ class PolicyConfig(BaseModel):
     max_actions_per_minute: int = 30
 
 
-class PolicyViolation(BaseModel):
+@dataclass(slots=True)
+class PolicyViolation:
     """A policy violation detected"""
     rule: str
     detail: str
@@ -260,11 +269,21 @@ class Snapshot(BaseModel):
     agent_thought: Optional[str] = None
 
 
+MAX_REPLAY_SNAPSHOTS = 120  # 60 seconds at one snapshot per 500ms
+
+
 class ReplayBuffer(BaseModel):
-    """Rolling buffer of snapshots"""
+    """Rolling buffer of snapshots (oldest evicted once full; dumps to a JSON list)"""
     session_id: str
     max_duration_seconds: int = 60
-    snapshots: List[Snapshot] = []
+    snapshots: Deque[Snapshot] = Field(default_factory=lambda: deque(maxlen=MAX_REPLAY_SNAPSHOTS))
+    
+    @field_validator('snapshots')
+    @classmethod
+    def _bound_snapshots(cls, snapshots: Deque[Snapshot]) -> Deque[Snapshot]:
+        if snapshots.maxlen != MAX_REPLAY_SNAPSHOTS:
+            snapshots = deque(snapshots, maxlen=MAX_REPLAY_SNAPSHOTS)
+        return snapshots
 
 
 # ============================================
@@ -14,9 +14,10 @@ Supports:
 
 import re
 import time
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Any, Pattern, Tuple
 from sentinel_backend.models import PolicyConfig, PolicyEvaluation, PolicyViolation, Severity, ActionDecision
-from sentinel_backend.utils import logger, is_blocked_domain, RateLimiter
+from sentinel_backend.utils import logger, extract_domain, RateLimiter
 
 
 # ============================================
@@ -76,9 +77,10 @@ class PolicyStore:
     
     def get_rate_limiter(self, session_id: str, max_per_minute: int = 30) -> RateLimiter:
         """Get or create rate limiter for session"""
-        if session_id not in self._rate_limiters:
-            self._rate_limiters[session_id] = RateLimiter(max_per_minute)
-        return self._rate_limiters[session_id]
+        rate_limiter = self._rate_limiters.get(session_id)
+        if rate_limiter is None:
+            rate_limiter = self._rate_limiters[session_id] = RateLimiter(max_per_minute)
+        return rate_limiter
     
     def cleanup_session(self, session_id: str):
         """Cleanup rate limiter for session"""
@@ -89,10 +91,115 @@ class PolicyStore:
 policy_store = PolicyStore()
 
 
+# Target substrings that mark a click/submit as a payment
+_PAYMENT_KEYWORDS = ('pay', 'checkout', 'purchase', 'buy')
+
+
+@lru_cache(maxsize=64)
+def _lowered_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lowercased confirmation keywords, computed once per keyword list"""
+    return tuple(keyword.lower() for keyword in keywords)
+
+
+@lru_cache(maxsize=64)
+def _blocked_selector_pattern(blocked_selectors: Tuple[str, ...]) -> Pattern:
+    """
+    One compiled alternation for a policy's blocked selectors.
+    
+    Each selector matches as a substring with '*' as a wildcard; keyed by
+    content, so edited or ad-hoc policies get their own pattern.
+    """
+    return re.compile('|'.join(
+        '(?:' + re.escape(blocked).replace(r'\*', '.*') + ')' for blocked in blocked_selectors
+    ))
+
+
+@lru_cache(maxsize=64)
+def _domain_blocks(blocked_domains: Tuple[str, ...]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """
+    Split a policy's blocked domains into (exact names, '.suffix' tuple).
+    
+    Same matching as utils.is_blocked_domain: '*.x' blocks subdomains of x,
+    a plain 'x' blocks x itself and its subdomains.
+    """
+    exact = set()
+    suffixes = set()
+    for pattern in blocked_domains:
+        if pattern.startswith('*.'):
+            suffixes.add(pattern[1:])
+        else:
+            exact.add(pattern)
+            suffixes.add('.' + pattern)
+    return frozenset(exact), tuple(sorted(suffixes, key=len, reverse=True))
+
+
 # ============================================
 # POLICY EVALUATION
 # ============================================
 
+# One bit per evaluation check, in check order
+F_TRUST = 1
+F_DOMAIN = 2
+F_SELECTOR = 4
+F_PAY = 8
+F_AMOUNT = 16
+F_CONFIRM = 32
+F_RATE = 64
+
+# Checks grouped by the severity of the violation they raise
+CRIT_MASK = F_DOMAIN | F_AMOUNT
+HIGH_MASK = F_TRUST | F_SELECTOR | F_PAY | F_RATE
+
+
+@lru_cache(maxsize=4096)
+def _static_flags(
+    blocked_domains: Tuple[str, ...],
+    blocked_selectors: Tuple[str, ...],
+    allow_payments: bool,
+    require_confirmation_for: Tuple[str, ...],
+    action_type: str,
+    target: str,
+    url: str
+) -> int:
+    """
+    Flags for the checks that depend only on the policy and the action
+    (blocked domain/selector, payments, confirmation).
+    
+    Keyed by content, so repeated actions (the same selector clicked again,
+    the same page revisited) skip the string matching entirely.
+    """
+    flags = 0
+    
+    # Check 2: Blocked domains
+    if url and blocked_domains:
+        blocked_exact, blocked_suffixes = _domain_blocks(blocked_domains)
+        domain = extract_domain(url)
+        if domain in blocked_exact or domain.endswith(blocked_suffixes):
+            flags |= F_DOMAIN
+    
+    # Check 3: Blocked selectors
+    if target and blocked_selectors:
+        if _blocked_selector_pattern(blocked_selectors).search(target):
+            flags |= F_SELECTOR
+    
+    target_lc = target.lower()
+    
+    # Check 4: Payment restrictions
+    if action_type in ['CLICK', 'SUBMIT']:
+        is_payment = any(kw in target_lc for kw in _PAYMENT_KEYWORDS)
+        if is_payment and not allow_payments:
+            flags |= F_PAY
+    
+    # Check 6: Confirmation requirements
+    action_type_lc = action_type.lower()
+    for keyword in _lowered_keywords(require_confirmation_for):
+        if keyword in target_lc or keyword in action_type_lc:
+            flags |= F_CONFIRM
+            break
+    
+    return flags
+
+
 def evaluate_action(
     action: Dict[str, Any],
     context: Dict[str, Any],
@@ -115,96 +222,95 @@ def evaluate_action(
         user_id = context.get('user_id', 'default')
         policy = policy_store.get_policy(user_id)
     
-    violations = []
-    risk_modifier = 0.0
-    
     action_type = action.get('type', '').upper()
     target = action.get('target_element', '') or action.get('selector', '')
     url = action.get('url', '') or context.get('current_url', '')
     trust_score = context.get('trust_score', 100)
     session_id = context.get('session_id', 'unknown')
+    amount = action.get('amount', 0)
+    
+    # Checks 2, 3, 4, 6 (cached per policy + action)
+    flags = _static_flags(
+        tuple(policy.blocked_domains),
+        tuple(policy.blocked_selectors),
+        policy.allow_payments,
+        tuple(policy.require_confirmation_for),
+        action_type,
+        target,
+        url
+    )
     
     # Check 1: Trust score minimum
     if trust_score < policy.min_trust_score:
-        violations.append(PolicyViolation(
-            rule="min_trust_score",
-            detail=f"Trust score {trust_score:.0f} below minimum {policy.min_trust_score}",
-            severity=Severity.HIGH
-        ))
-        risk_modifier += 30
+        flags |= F_TRUST
     
-    # Check 2: Blocked domains
-    if url and policy.blocked_domains:
-        if is_blocked_domain(url, policy.blocked_domains):
+    # Check 5: Financial amount limits
+    if amount and amount > policy.max_transaction:
+        flags |= F_AMOUNT
+    
+    # Check 7: Rate limiting (stateful; runs on every call)
+    rate_limiter = policy_store.get_rate_limiter(session_id, policy.max_actions_per_minute)
+    if not rate_limiter.is_allowed():
+        flags |= F_RATE
+    
+    # Violations in check order
+    violations = []
+    risk_modifier = 0.0
+    if flags:
+        if flags & F_TRUST:
+            violations.append(PolicyViolation(
+                rule="min_trust_score",
+                detail=f"Trust score {trust_score:.0f} below minimum {policy.min_trust_score}",
+                severity=Severity.HIGH
+            ))
+            risk_modifier += 30
+        if flags & F_DOMAIN:
             violations.append(PolicyViolation(
                 rule="blocked_domain",
                 detail=f"Domain is blocked: {url}",
                 severity=Severity.CRITICAL
             ))
             risk_modifier += 50
-    
-    # Check 3: Blocked selectors
-    if target and policy.blocked_selectors:
-        for blocked in policy.blocked_selectors:
-            if blocked in target or re.search(re.escape(blocked).replace(r'\*', '.*'), target):
-                violations.append(PolicyViolation(
-                    rule="blocked_selector",
-                    detail=f"Selector is blocked: {target}",
-                    severity=Severity.HIGH
-                ))
-                risk_modifier += 40
-                break
-    
-    # Check 4: Payment restrictions
-    if action_type in ['CLICK', 'SUBMIT']:
-        is_payment = any(kw in target.lower() for kw in ['pay', 'checkout', 'purchase', 'buy'])
-        if is_payment and not policy.allow_payments:
+        if flags & F_SELECTOR:
+            violations.append(PolicyViolation(
+                rule="blocked_selector",
+                detail=f"Selector is blocked: {target}",
+                severity=Severity.HIGH
+            ))
+            risk_modifier += 40
+        if flags & F_PAY:
             violations.append(PolicyViolation(
                 rule="payments_disabled",
                 detail="Payments are not allowed by policy",
                 severity=Severity.HIGH
             ))
             risk_modifier += 40
-    
-    # Check 5: Financial amount limits
-    amount = action.get('amount', 0)
-    if amount and amount > policy.max_transaction:
-        violations.append(PolicyViolation(
-            rule="max_transaction",
-            detail=f"Amount ${amount} exceeds limit ${policy.max_transaction}",
-            severity=Severity.CRITICAL
-        ))
-        risk_modifier += 50
-    
-    # Check 6: Confirmation requirements
-    requires_confirmation = False
-    for keyword in policy.require_confirmation_for:
-        if keyword.lower() in target.lower() or keyword.lower() in action_type.lower():
-            requires_confirmation = True
-            break
-    
-    if requires_confirmation:
-        violations.append(PolicyViolation(
-            rule="requires_confirmation",
-            detail=f"Action requires human confirmation",
-            severity=Severity.MEDIUM
-        ))
-        risk_modifier += 15
-    
-    # Check 7: Rate limiting
-    rate_limiter = policy_store.get_rate_limiter(session_id, policy.max_actions_per_minute)
-    if not rate_limiter.is_allowed():
-        violations.append(PolicyViolation(
-            rule="rate_limit",
-            detail=f"Rate limit exceeded: {policy.max_actions_per_minute}/min",
-            severity=Severity.HIGH
-        ))
-        risk_modifier += 30
+        if flags & F_AMOUNT:
+            violations.append(PolicyViolation(
+                rule="max_transaction",
+                detail=f"Amount ${amount} exceeds limit ${policy.max_transaction}",
+                severity=Severity.CRITICAL
+            ))
+            risk_modifier += 50
+        if flags & F_CONFIRM:
+            violations.append(PolicyViolation(
+                rule="requires_confirmation",
+                detail=f"Action requires human confirmation",
+                severity=Severity.MEDIUM
+            ))
+            risk_modifier += 15
+        if flags & F_RATE:
+            violations.append(PolicyViolation(
+                rule="rate_limit",
+                detail=f"Rate limit exceeded: {policy.max_actions_per_minute}/min",
+                severity=Severity.HIGH
+            ))
+            risk_modifier += 30
     
     # Determine if allowed
-    has_critical = any(v.severity == Severity.CRITICAL for v in violations)
-    has_high = any(v.severity == Severity.HIGH for v in violations)
-    has_confirmation = any(v.rule == "requires_confirmation" for v in violations)
+    has_critical = flags & CRIT_MASK
+    has_high = flags & HIGH_MASK
+    has_confirmation = flags & F_CONFIRM
     
     if has_critical:
         allowed = False
@@ -213,14 +319,15 @@ def evaluate_action(
     elif has_confirmation and not has_high:
         allowed = True  # Needs confirmation but not blocked
     else:
-        allowed = len(violations) == 0 or (len(violations) == 1 and has_confirmation)
+        allowed = flags == 0 or flags == F_CONFIRM
     
     latency = (time.perf_counter() - start) * 1000
     
-    return PolicyEvaluation(
+    # Fields are built here with their final types, so skip validation
+    return PolicyEvaluation.model_construct(
         allowed=allowed,
         violations=violations,
-        risk_modifier=min(risk_modifier, 100)
+        risk_modifier=min(risk_modifier, 100.0)
     )
 
 
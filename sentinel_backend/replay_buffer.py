@@ -12,12 +12,13 @@ Features:
 """
 
 import time
-from collections import deque
-from typing import Dict, List, Any, Optional
+from bisect import bisect_left
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from datetime import datetime
-from sentinel_backend.models import Snapshot, AgentState, RiskAssessment
-from sentinel_backend.utils import logger, generate_snapshot_id, now_iso, hash_dom
+from operator import attrgetter, itemgetter
+from sentinel_backend.models import Snapshot, AgentState, RiskAssessment, MAX_REPLAY_SNAPSHOTS
+from sentinel_backend.utils import logger, generate_snapshot_id, now_iso_epoch, hash_dom
 
 
 # ============================================
@@ -25,7 +26,7 @@ from sentinel_backend.utils import logger, generate_snapshot_id, now_iso, hash_d
 # ============================================
 
 DEFAULT_BUFFER_DURATION = 60  # seconds
-MAX_SNAPSHOTS = 120  # Maximum snapshots per session
+MAX_SNAPSHOTS = MAX_REPLAY_SNAPSHOTS  # Maximum snapshots per session
 SNAPSHOT_INTERVAL = 500  # ms between snapshots
 
 
@@ -33,6 +34,111 @@ SNAPSHOT_INTERVAL = 500  # ms between snapshots
 # REPLAY BUFFER
 # ============================================
 
+class RingBuffer:
+    """
+    Fixed-capacity FIFO over one preallocated list.
+    
+    Once full, append overwrites the oldest item. Supports len(), iteration
+    (oldest to newest), O(1) positional indexing (negative too, so bisect
+    works on it) and dropping from the head, which is all the replay
+    buffer needs; nothing is allocated after construction.
+    """
+    
+    __slots__ = ("buf", "head", "size", "cap")
+    
+    def __init__(self, cap: int):
+        self.buf: List[Any] = [None] * cap
+        self.head = 0
+        self.size = 0
+        self.cap = cap
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self) -> Iterator[Any]:
+        # Two C-level slices of the backing list (head..end, then the wrapped part)
+        end = self.head + self.size
+        if end <= self.cap:
+            return islice(self.buf, self.head, end)
+        return chain(islice(self.buf, self.head, None), islice(self.buf, 0, end - self.cap))
+    
+    def __getitem__(self, pos: int) -> Any:
+        if pos < 0:
+            pos += self.size
+        if not 0 <= pos < self.size:
+            raise IndexError("RingBuffer index out of range")
+        return self.buf[(self.head + pos) % self.cap]
+    
+    def append(self, item: Any):
+        if self.size < self.cap:
+            self.buf[(self.head + self.size) % self.cap] = item
+            self.size += 1
+        else:
+            self.buf[self.head] = item
+            self.head = (self.head + 1) % self.cap
+    
+    def drop(self, count: int):
+        """Discard the `count` oldest items"""
+        count = min(count, self.size)
+        for i in range(count):
+            self.buf[(self.head + i) % self.cap] = None
+        self.head = (self.head + count) % self.cap
+        self.size -= count
+
+
+_risk_score = attrgetter('risk_score')
+_trust_score = attrgetter('trust_score')
+_timestamp = attrgetter('timestamp')
+# (field name, dump key getter) for every Snapshot field, in model order
+_SNAPSHOT_FIELDS = tuple((name, itemgetter(name)) for name in Snapshot.model_fields)
+
+# States whose onset marks a critical moment
+_ALERT_STATES = frozenset((AgentState.BLOCKED, AgentState.COMPROMISED))
+
+
+def _critical_reasons(snap: Snapshot, prev: Optional[Snapshot]) -> List[str]:
+    """Why a snapshot is a critical moment, relative to the one before it (if any)"""
+    prev_risk = prev.risk_score if prev is not None else 0
+    prev_trust = prev.trust_score if prev is not None else 100
+    prev_state = prev.agent_state if prev is not None else None
+    
+    reasons = []
+    
+    # Risk spike
+    if snap.risk_score - prev_risk >= 30:
+        reasons.append("Risk spike")
+    
+    # High risk
+    if snap.risk_score >= 70:
+        reasons.append("High risk")
+    
+    # Trust drop
+    if prev_trust - snap.trust_score >= 20:
+        reasons.append("Trust drop")
+    
+    # State change (members are singletons, so identity is equality)
+    state = snap.agent_state
+    if prev_state is not None and state is not prev_state and state in _ALERT_STATES:
+        reasons.append(f"State: {state.value}")
+    
+    # Threats detected
+    if snap.active_threats:
+        reasons.append(f"Threats: {len(snap.active_threats)}")
+    
+    return reasons
+
+
+def _critical_moment(snap: Snapshot, snap_dict: Dict[str, Any], reasons: List[str]) -> Dict[str, Any]:
+    """Critical-moment entry as returned by get_critical_moments"""
+    return {
+        'snapshot': snap_dict,
+        'reasons': reasons,
+        'timestamp': snap.timestamp,
+        'risk_score': snap.risk_score,
+        'trust_score': snap.trust_score
+    }
+
+
 class ReplayBufferManager:
     """
     Manages replay buffers for all sessions.
@@ -42,14 +148,33 @@ class ReplayBufferManager:
     """
     
     def __init__(self, buffer_duration: int = DEFAULT_BUFFER_DURATION):
-        # session_id -> deque of snapshots
-        self._buffers: Dict[str, deque] = {}
+        # session_id -> ring of snapshots
+        self._buffers: Dict[str, RingBuffer] = {}
+        # session_id -> epoch seconds of each snapshot, aligned with _buffers
+        self._epochs: Dict[str, RingBuffer] = {}
+        # session_id -> model_dump() of each snapshot, aligned with _buffers
+        self._dumps: Dict[str, RingBuffer] = {}
+        # session_id -> (index, moment) for snapshots that were critical vs.
+        # their predecessor when added; may trail entries already evicted
+        self._critical: Dict[str, RingBuffer] = {}
+        # session_id -> running peak_risk / min_trust / total_threats over the buffer
+        self._stats: Dict[str, Dict[str, float]] = {}
+        # Sessions whose peak/min snapshot was evicted (rescanned on next read)
+        self._stale_extrema: Set[str] = set()
+        # session_id -> (snapshot count, forensic report built at that count)
+        self._report_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
         self._buffer_duration = buffer_duration
         self._snapshot_counts: Dict[str, int] = {}
     
     def create_buffer(self, session_id: str):
         """Create new replay buffer for session"""
-        self._buffers[session_id] = deque(maxlen=MAX_SNAPSHOTS)
+        self._buffers[session_id] = RingBuffer(MAX_SNAPSHOTS)
+        self._epochs[session_id] = RingBuffer(MAX_SNAPSHOTS)
+        self._dumps[session_id] = RingBuffer(MAX_SNAPSHOTS)
+        self._critical[session_id] = RingBuffer(MAX_SNAPSHOTS)
+        self._stats[session_id] = {'peak_risk': float('-inf'), 'min_trust': float('inf'), 'total_threats': 0}
+        self._stale_extrema.discard(session_id)
+        self._report_cache.pop(session_id, None)
         self._snapshot_counts[session_id] = 0
         logger.info(f"[REPLAY] Created buffer for session {session_id}")
     
@@ -77,9 +202,11 @@ class ReplayBufferManager:
         buffer = self._buffers[session_id]
         index = self._snapshot_counts.get(session_id, 0)
         
+        # One clock read for both the ISO timestamp and the epoch used by queries
+        timestamp, epoch = now_iso_epoch()
         snapshot = Snapshot(
             index=index,
-            timestamp=now_iso(),
+            timestamp=timestamp,
             agent_state=agent_state,
             current_url=current_url,
             dom_hash=hash_dom(dom_tree) if dom_tree else None,
@@ -91,7 +218,28 @@ class ReplayBufferManager:
             agent_thought=agent_thought
         )
         
+        # Snapshots are never modified after creation: dump once, reuse on every read
+        snap_dict = snapshot.model_dump()
+        
+        # Eviction only ever drops the head, so every later snapshot keeps
+        # the predecessor its reasons were computed against
+        reasons = _critical_reasons(snapshot, buffer[-1] if buffer else None)
+        if reasons:
+            self._critical[session_id].append((index, _critical_moment(snapshot, snap_dict, reasons)))
+        
+        if len(buffer) == buffer.cap:
+            # Appending overwrites the oldest snapshot
+            self._remove_from_stats(session_id, buffer[0])
+        stats = self._stats[session_id]
+        if snapshot.risk_score > stats['peak_risk']:
+            stats['peak_risk'] = snapshot.risk_score
+        if snapshot.trust_score < stats['min_trust']:
+            stats['min_trust'] = snapshot.trust_score
+        stats['total_threats'] += len(snapshot.active_threats)
+        
         buffer.append(snapshot)
+        self._epochs[session_id].append(epoch)
+        self._dumps[session_id].append(snap_dict)
         self._snapshot_counts[session_id] = index + 1
         
         # Prune old snapshots
@@ -105,39 +253,60 @@ class ReplayBufferManager:
         if not buffer:
             return
         
+        epochs = self._epochs[session_id]
         cutoff = time.time() - self._buffer_duration
         
-        while buffer:
-            oldest = buffer[0]
-            try:
-                oldest_time = datetime.fromisoformat(oldest.timestamp.replace('Z', '+00:00')).timestamp()
-                if oldest_time < cutoff:
-                    buffer.popleft()
-                else:
-                    break
-            except:
-                break
+        # Epochs are appended in time order: everything before the first
+        # one at/after the cutoff has expired
+        expired = bisect_left(epochs, cutoff)
+        if expired:
+            for i in range(expired):
+                self._remove_from_stats(session_id, buffer[i])
+            buffer.drop(expired)
+            epochs.drop(expired)
+            self._dumps[session_id].drop(expired)
+    
+    def _remove_from_stats(self, session_id: str, snap: Snapshot):
+        """Take a snapshot leaving the buffer out of the running stats"""
+        stats = self._stats[session_id]
+        stats['total_threats'] -= len(snap.active_threats)
+        if snap.risk_score >= stats['peak_risk'] or snap.trust_score <= stats['min_trust']:
+            self._stale_extrema.add(session_id)
     
     def get_timeline(self, session_id: str) -> List[Snapshot]:
-        """Get full replay timeline for session"""
-        buffer = self._buffers.get(session_id)
-        if not buffer:
+        """
+        Get full replay timeline for session, one dict per snapshot.
+        
+        Prefer get_timeline_columnar when the consumer can zip columns.
+        """
+        dumps = self._dumps.get(session_id)
+        if not dumps:
             return []
         
-        snapshots = list(buffer)
+        # Add is_first/is_last markers (not in model, add to a copy of the cached dump)
+        last = len(dumps) - 1
+        timeline = []
+        for i, snap_dict in enumerate(dumps):
+            snap_dict = snap_dict.copy()
+            snap_dict['is_first'] = (i == 0)
+            snap_dict['is_last'] = (i == last)
+            timeline.append(snap_dict)
+        return timeline
+    
+    def get_timeline_columnar(self, session_id: str) -> Dict[str, List[Any]]:
+        """
+        Get full replay timeline for session as one list per Snapshot field,
+        oldest first (row i of every column is snapshot i).
         
-        # Mark first and last
-        if snapshots:
-            # Add is_first/is_last markers (not in model, add to dict)
-            timeline = []
-            for i, snap in enumerate(snapshots):
-                snap_dict = snap.model_dump()
-                snap_dict['is_first'] = (i == 0)
-                snap_dict['is_last'] = (i == len(snapshots) - 1)
-                timeline.append(snap_dict)
-            return timeline
+        Skips copying a dict per snapshot; values come from the cached dumps,
+        so nested ones (active_threats, last_action) are shared with the
+        buffer and must be treated as read-only, as with get_timeline.
+        """
+        dumps = self._dumps.get(session_id)
+        if not dumps:
+            return {name: [] for name, _ in _SNAPSHOT_FIELDS}
         
-        return []
+        return {name: list(map(getter, dumps)) for name, getter in _SNAPSHOT_FIELDS}
     
     def get_snapshot_at_index(self, session_id: str, index: int) -> Optional[Snapshot]:
         """Get specific snapshot by index"""
@@ -145,9 +314,11 @@ class ReplayBufferManager:
         if not buffer:
             return None
         
-        for snap in buffer:
-            if snap.index == index:
-                return snap
+        # Indexes are consecutive and only ever dropped from the head
+        first_index = self._snapshot_counts[session_id] - len(buffer)
+        pos = index - first_index
+        if 0 <= pos < len(buffer):
+            return buffer[pos]
         
         return None
     
@@ -165,17 +336,11 @@ class ReplayBufferManager:
         closest = None
         closest_diff = float('inf')
         
-        for snap in buffer:
-            try:
-                snap_time = datetime.fromisoformat(
-                    snap.timestamp.replace('Z', '+00:00')
-                ).timestamp()
-                diff = abs(snap_time - target_time)
-                if diff < closest_diff:
-                    closest_diff = diff
-                    closest = snap
-            except:
-                continue
+        for snap, snap_time in zip(buffer, self._epochs[session_id]):
+            diff = abs(snap_time - target_time)
+            if diff < closest_diff:
+                closest_diff = diff
+                closest = snap
         
         return closest
     
@@ -193,47 +358,24 @@ class ReplayBufferManager:
         if not buffer:
             return []
         
-        critical = []
-        prev_risk = 0
-        prev_trust = 100
-        prev_state = None
-        
-        for snap in buffer:
-            reasons = []
-            
-            # Risk spike
-            if snap.risk_score - prev_risk >= 30:
-                reasons.append("Risk spike")
-            
-            # High risk
-            if snap.risk_score >= 70:
-                reasons.append("High risk")
-            
-            # Trust drop
-            if prev_trust - snap.trust_score >= 20:
-                reasons.append("Trust drop")
-            
-            # State change
-            if prev_state and snap.agent_state != prev_state:
-                if snap.agent_state in [AgentState.BLOCKED, AgentState.COMPROMISED]:
-                    reasons.append(f"State: {snap.agent_state.value}")
-            
-            # Threats detected
-            if snap.active_threats:
-                reasons.append(f"Threats: {len(snap.active_threats)}")
-            
-            if reasons:
-                critical.append({
-                    'snapshot': snap.model_dump(),
-                    'reasons': reasons,
-                    'timestamp': snap.timestamp,
-                    'risk_score': snap.risk_score,
-                    'trust_score': snap.trust_score
-                })
-            
-            prev_risk = snap.risk_score
-            prev_trust = snap.trust_score
-            prev_state = snap.agent_state
+        first_index = self._snapshot_counts[session_id] - len(buffer)
+        
+        # The head's predecessor may have been evicted: it compares
+        # against the initial state instead
+        head = buffer[0]
+        head_reasons = _critical_reasons(head, None)
+        critical = [_critical_moment(head, self._dumps[session_id][0].copy(), head_reasons)] if head_reasons else []
+        
+        # Drop entries for evicted snapshots, then copy the live ones
+        recorded = self._critical[session_id]
+        stale = 0
+        while stale < len(recorded) and recorded[stale][0] < first_index:
+            stale += 1
+        recorded.drop(stale)
+        
+        for index, moment in recorded:
+            if index > first_index:
+                critical.append(dict(moment, snapshot=moment['snapshot'].copy(), reasons=list(moment['reasons'])))
         
         return critical
     
@@ -252,26 +394,73 @@ class ReplayBufferManager:
             for snap in buffer
         ]
     
+    def get_risk_evolution_columnar(self, session_id: str) -> Dict[str, List[Any]]:
+        """
+        Get risk evolution as parallel columns: timestamps ('t'), risk
+        scores ('r') and trust scores ('u').
+        
+        Cheaper to build than one dict per snapshot and smaller once
+        serialized; charts can zip the columns at render time.
+        """
+        buffer = self._buffers.get(session_id)
+        if not buffer:
+            return {'t': [], 'r': [], 'u': []}
+        
+        return {
+            't': list(map(_timestamp, buffer)),
+            'r': list(map(_risk_score, buffer)),
+            'u': list(map(_trust_score, buffer))
+        }
+    
     def get_buffer_stats(self, session_id: str) -> Dict[str, Any]:
         """Get statistics about the replay buffer"""
         buffer = self._buffers.get(session_id)
         if not buffer:
             return {'snapshots': 0}
         
-        snapshots = list(buffer)
+        stats = self._stats[session_id]
+        if session_id in self._stale_extrema:
+            # An extremum was evicted: rescan (C-level map/attrgetter passes)
+            stats['peak_risk'] = max(map(_risk_score, buffer))
+            stats['min_trust'] = min(map(_trust_score, buffer))
+            self._stale_extrema.discard(session_id)
         
         return {
-            'snapshots': len(snapshots),
-            'first_timestamp': snapshots[0].timestamp if snapshots else None,
-            'last_timestamp': snapshots[-1].timestamp if snapshots else None,
-            'peak_risk': max((s.risk_score for s in snapshots), default=0),
-            'min_trust': min((s.trust_score for s in snapshots), default=100),
-            'total_threats': sum(len(s.active_threats) for s in snapshots)
+            'snapshots': len(buffer),
+            'first_timestamp': buffer[0].timestamp,
+            'last_timestamp': buffer[-1].timestamp,
+            'peak_risk': stats['peak_risk'],
+            'min_trust': stats['min_trust'],
+            'total_threats': stats['total_threats']
         }
     
+    def get_cached_report(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Forensic report cached for the buffer's current contents, if any"""
+        cached = self._report_cache.get(session_id)
+        if cached is not None and cached[0] == self._snapshot_counts.get(session_id):
+            return cached[1]
+        return None
+    
+    def cache_report(self, session_id: str, report: Dict[str, Any]):
+        """
+        Cache a forensic report for the buffer's current contents.
+        
+        The buffer only changes in add_snapshot (pruning included), which
+        advances the snapshot count, so the count identifies its contents.
+        """
+        version = self._snapshot_counts.get(session_id)
+        if version is not None:
+            self._report_cache[session_id] = (version, report)
+    
     def cleanup(self, session_id: str):
         """Remove buffer for session"""
         self._buffers.pop(session_id, None)
+        self._epochs.pop(session_id, None)
+        self._dumps.pop(session_id, None)
+        self._critical.pop(session_id, None)
+        self._stats.pop(session_id, None)
+        self._report_cache.pop(session_id, None)
+        self._stale_extrema.discard(session_id)
         self._snapshot_counts.pop(session_id, None)
         logger.info(f"[REPLAY] Cleaned up buffer for session {session_id}")
 
@@ -293,41 +482,49 @@ def generate_forensic_report(session_id: str) -> Dict[str, Any]:
     - Critical moments
     - Risk evolution
     - Threat analysis
+    
+    Reused until the session's buffer changes; treat the result as read-only.
     """
-    timeline = replay_manager.get_timeline(session_id)
-    critical = replay_manager.get_critical_moments(session_id)
+    cached = replay_manager.get_cached_report(session_id)
+    if cached is not None:
+        return cached
+    
     stats = replay_manager.get_buffer_stats(session_id)
-    risk_evolution = replay_manager.get_risk_evolution(session_id)
+    snapshot_count = stats['snapshots']
     
-    if not timeline:
+    if not snapshot_count:
         return {
             'error': 'No forensic data available',
             'session_id': session_id
         }
     
-    # Calculate summary
-    risk_scores = [s.get('risk_score', 0) for s in timeline]
-    trust_scores = [s.get('trust_score', 100) for s in timeline]
+    critical = replay_manager.get_critical_moments(session_id)
+    risk_evolution = replay_manager.get_risk_evolution(session_id)
     
+    # Summary comes from the running stats and the buffer's ends; no
+    # per-snapshot timeline copy is needed
+    final = risk_evolution[-1]
     summary = {
         'session_id': session_id,
-        'duration_seconds': len(timeline) * (SNAPSHOT_INTERVAL / 1000),
-        'total_snapshots': len(timeline),
-        'peak_risk_score': max(risk_scores) if risk_scores else 0,
-        'final_risk_score': risk_scores[-1] if risk_scores else 0,
-        'final_trust_score': trust_scores[-1] if trust_scores else 100,
+        'duration_seconds': snapshot_count * (SNAPSHOT_INTERVAL / 1000),
+        'total_snapshots': snapshot_count,
+        'peak_risk_score': stats['peak_risk'],
+        'final_risk_score': final['risk_score'],
+        'final_trust_score': final['trust_score'],
         'critical_moments_count': len(critical),
-        'first_snapshot': timeline[0]['timestamp'] if timeline else None,
-        'last_snapshot': timeline[-1]['timestamp'] if timeline else None
+        'first_snapshot': stats['first_timestamp'],
+        'last_snapshot': stats['last_timestamp']
     }
     
-    return {
+    report = {
         'summary': summary,
         'stats': stats,
         'critical_moments': critical[:10],  # Top 10 critical moments
         'risk_evolution': risk_evolution,
-        'timeline_length': len(timeline)
+        'timeline_length': snapshot_count
     }
+    replay_manager.cache_report(session_id, report)
+    return report
 
 
 # ============================================
@@ -14,7 +14,7 @@ from typing import Dict, List, Any, Optional
 from sentinel_backend.models import SessionReport, SessionMetrics
 from sentinel_backend.replay_buffer import replay_manager, generate_forensic_report
 from sentinel_backend.metrics_engine import metrics_engine
-from sentinel_backend.utils import logger, now_iso
+from sentinel_backend.utils import logger, now_iso, dumps_json_bytes
 
 
 # ============================================
@@ -31,6 +31,8 @@ class SessionDataStore:
     def __init__(self):
         self._sessions: Dict[str, Dict[str, Any]] = {}
         self._threats: Dict[str, List[Dict]] = {}
+        # session_id -> distinct threat types in first-seen order (dict as ordered set)
+        self._threat_types: Dict[str, Dict[str, None]] = {}
         self._actions: Dict[str, List[Dict]] = {}
     
     def create_session(
@@ -49,6 +51,7 @@ class SessionDataStore:
             **kwargs
         }
         self._threats[session_id] = []
+        self._threat_types[session_id] = {}
         self._actions[session_id] = []
     
     def get_session(self, session_id: str) -> Optional[Dict]:
@@ -68,6 +71,7 @@ class SessionDataStore:
             **threat,
             'timestamp': now_iso()
         })
+        self._threat_types.setdefault(session_id, {})[threat.get('type', 'UNKNOWN')] = None
     
     def add_action(self, session_id: str, action: Dict[str, Any]):
         """Add action to session log"""
@@ -82,6 +86,10 @@ class SessionDataStore:
         """Get all threats for session"""
         return self._threats.get(session_id, [])
     
+    def get_threat_types(self, session_id: str) -> List[str]:
+        """Get the distinct threat types logged for session, in first-seen order"""
+        return list(self._threat_types.get(session_id, ()))
+    
     def get_actions(self, session_id: str) -> List[Dict]:
         """Get all actions for session"""
         return self._actions.get(session_id, [])
@@ -90,6 +98,7 @@ class SessionDataStore:
         """Remove session data"""
         self._sessions.pop(session_id, None)
         self._threats.pop(session_id, None)
+        self._threat_types.pop(session_id, None)
         self._actions.pop(session_id, None)
 
 
@@ -117,6 +126,7 @@ def generate_session_report(session_id: str) -> Dict[str, Any]:
     
     # Get forensic data
     forensics = generate_forensic_report(session_id)
+    forensic_summary = forensics.get('summary', {})
     
     # Get metrics
     metrics = metrics_engine.get_session_metrics(session_id)
@@ -138,16 +148,16 @@ def generate_session_report(session_id: str) -> Dict[str, Any]:
             'created_at': session.get('created_at'),
             'ended_at': session.get('ended_at'),
             'final_state': session.get('final_state', 'UNKNOWN'),
-            'duration_seconds': forensics.get('summary', {}).get('duration_seconds', 0)
+            'duration_seconds': forensic_summary.get('duration_seconds', 0)
         },
         
         # Security analysis
         'security_analysis': {
-            'final_risk_score': forensics.get('summary', {}).get('final_risk_score', 0),
-            'peak_risk_score': forensics.get('summary', {}).get('peak_risk_score', 0),
-            'final_trust_score': forensics.get('summary', {}).get('final_trust_score', 100),
+            'final_risk_score': forensic_summary.get('final_risk_score', 0),
+            'peak_risk_score': forensic_summary.get('peak_risk_score', 0),
+            'final_trust_score': forensic_summary.get('final_trust_score', 100),
             'threats_detected': len(threats),
-            'threat_types': list(set(t.get('type', 'UNKNOWN') for t in threats)),
+            'threat_types': session_store.get_threat_types(session_id),
             'critical_moments': forensics.get('critical_moments', [])[:5]
         },
         
@@ -164,6 +174,16 @@ def generate_session_report(session_id: str) -> Dict[str, Any]:
     return report
 
 
+def generate_session_report_bytes(session_id: str) -> bytes:
+    """
+    Generate the session report already encoded as JSON.
+    
+    The report holds only plain data (models are dumped while it is
+    built), so it goes straight to the encoder with no default handler.
+    """
+    return dumps_json_bytes(generate_session_report(session_id))
+
+
 def generate_markdown_report(session_id: str) -> str:
     """
     Generate markdown-formatted report.
@@ -246,6 +266,8 @@ def generate_pdf_data(session_id: str) -> Dict[str, Any]:
     Can be used with PDF libraries like reportlab or weasyprint.
     """
     report = generate_session_report(session_id)
+    session = report.get('session_summary', {})
+    security = report.get('security_analysis', {})
     
     return {
         'title': f"Sentinel Security Report - {session_id}",
@@ -255,19 +277,19 @@ def generate_pdf_data(session_id: str) -> Dict[str, Any]:
                 'title': 'Session Summary',
                 'type': 'table',
                 'data': [
-                    ['Target URL', report.get('session_summary', {}).get('target_url', 'N/A')],
-                    ['Task', report.get('session_summary', {}).get('task_goal', 'N/A')],
-                    ['Duration', f"{report.get('session_summary', {}).get('duration_seconds', 0)}s"],
-                    ['Status', report.get('session_summary', {}).get('final_state', 'UNKNOWN')]
+                    ['Target URL', session.get('target_url', 'N/A')],
+                    ['Task', session.get('task_goal', 'N/A')],
+                    ['Duration', f"{session.get('duration_seconds', 0)}s"],
+                    ['Status', session.get('final_state', 'UNKNOWN')]
                 ]
             },
             {
                 'title': 'Security Analysis',
                 'type': 'table',
                 'data': [
-                    ['Risk Score', report.get('security_analysis', {}).get('final_risk_score', 0)],
-                    ['Trust Score', report.get('security_analysis', {}).get('final_trust_score', 100)],
-                    ['Threats', report.get('security_analysis', {}).get('threats_detected', 0)]
+                    ['Risk Score', security.get('final_risk_score', 0)],
+                    ['Trust Score', security.get('final_trust_score', 100)],
+                    ['Threats', security.get('threats_detected', 0)]
                 ]
             },
             {
@@ -11,13 +11,14 @@ Features:
 """
 
 import time
+from bisect import bisect_right
 from typing import Dict, List, Any, Optional
 from sentinel_backend.models import (
     RiskAssessment, RiskBreakdown, DetectionResult, 
     SemanticAnalysis, PolicyEvaluation, HallucinationCheck,
     ActionDecision, Severity
 )
-from sentinel_backend.utils import logger, score_to_severity
+from sentinel_backend.utils import logger
 
 
 # ============================================
@@ -53,6 +54,15 @@ THRESHOLDS = {
     'block': 70       # Above this: BLOCK
 }
 
+# Score -> outcome tables: entry i applies from threshold i-1 (inclusive) up
+_DECISION_THRESHOLDS = (THRESHOLDS['confirm'], THRESHOLDS['block'])
+_DECISIONS = (ActionDecision.ALLOW, ActionDecision.REQUIRE_CONFIRMATION, ActionDecision.BLOCK)
+_TRUST_DELTA_THRESHOLDS = (30, 50, 70)
+_TRUST_DELTAS = (0, -5, -15, -30)
+# Same bands as utils.score_to_severity
+_SEVERITY_THRESHOLDS = (20, 40, 60, 80)
+_SEVERITIES = (Severity.INFO, Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
+
 
 # ============================================
 # RISK CALCULATION
@@ -96,84 +106,34 @@ def calculate_risk_score(
             total_score=100.0,
             severity=Severity.CRITICAL,
             decision=ActionDecision.BLOCK,
-            breakdown=RiskBreakdown(honeypot=100),
+            breakdown=RiskBreakdown(honeypot=100.0),
             explanation="HONEYPOT TRIGGERED - Agent compromised",
             triggered_modules=["honeypot"],
             trust_delta=-100,
             latency_ms=(time.perf_counter() - start) * 1000
         )
     
-    # Process prompt injection
-    if pi := detections.get('prompt_injection'):
-        score = _get_detection_score(pi)
-        breakdown.prompt_injection = score
-        if score > 0:
-            triggered_modules.append('prompt_injection')
-            total_weighted_score += score * RISK_WEIGHTS['prompt_injection']
-            total_weight += RISK_WEIGHTS['prompt_injection']
-    
-    # Process hidden content
-    if hc := detections.get('hidden_content'):
-        score = _get_detection_score(hc)
-        breakdown.hidden_content = score
-        if score > 0:
-            triggered_modules.append('hidden_content')
-            total_weighted_score += score * RISK_WEIGHTS['hidden_content']
-            total_weight += RISK_WEIGHTS['hidden_content']
-    
-    # Process deceptive UI
-    if du := detections.get('deceptive_ui'):
-        score = _get_detection_score(du)
-        breakdown.deceptive_ui = score
-        if score > 0:
-            triggered_modules.append('deceptive_ui')
-            total_weighted_score += score * RISK_WEIGHTS['deceptive_ui']
-            total_weight += RISK_WEIGHTS['deceptive_ui']
-    
-    # Process dynamic injection
-    if di := detections.get('dynamic_injection'):
-        score = _get_detection_score(di)
-        breakdown.dynamic_injection = score
-        if score > 0:
-            triggered_modules.append('dynamic_injection')
-            total_weighted_score += score * RISK_WEIGHTS['dynamic_injection']
-            total_weight += RISK_WEIGHTS['dynamic_injection']
-    
-    # Process shadow DOM
-    if sd := detections.get('shadow_dom'):
-        if hasattr(sd, 'threats'):
-            score = min(len(sd.threats) * 20, 100) if sd.threats else 0
-        else:
-            score = _get_detection_score(sd)
-        breakdown.shadow_dom = score
-        if score > 0:
-            triggered_modules.append('shadow_dom')
-            total_weighted_score += score * RISK_WEIGHTS['shadow_dom']
-            total_weight += RISK_WEIGHTS['shadow_dom']
-    
-    # Process semantic analysis
-    if sem := detections.get('semantic'):
-        if hasattr(sem, 'divergence_score'):
-            score = sem.divergence_score
-        else:
-            score = sem.get('divergence_score', 0) if isinstance(sem, dict) else 0
-        breakdown.semantic_drift = score
-        if score > 20:
-            triggered_modules.append('semantic_drift')
-            total_weighted_score += score * RISK_WEIGHTS['semantic_drift']
-            total_weight += RISK_WEIGHTS['semantic_drift']
-    
-    # Process hallucination
-    if hal := detections.get('hallucination'):
-        if hasattr(hal, 'is_hallucination'):
-            score = 80 if hal.is_hallucination else 0
-        else:
-            score = 80 if hal.get('is_hallucination', False) else 0
-        breakdown.hallucination = score
-        if score > 0:
-            triggered_modules.append('hallucination')
-            total_weighted_score += score * RISK_WEIGHTS['hallucination']
-            total_weight += RISK_WEIGHTS['hallucination']
+    # Weighted sum over the detection modules present, tracking the
+    # highest severity among them on the way
+    max_rank = 0
+    seen = 0
+    for key, field_name, extract_score, trigger_above in _RISK_FIELDS:
+        detection = detections.get(key)
+        if detection is None:
+            continue
+        seen += 1
+        rank = _severity_rank(detection)
+        if rank > max_rank:
+            max_rank = rank
+        if not detection:
+            continue
+        score = extract_score(detection)
+        setattr(breakdown, field_name, score)
+        if score > trigger_above:
+            weight = RISK_WEIGHTS[field_name]
+            triggered_modules.append(field_name)
+            total_weighted_score += score * weight
+            total_weight += weight
     
     # Process policy violations
     if policy_result:
@@ -193,31 +153,17 @@ def calculate_risk_score(
     else:
         raw_score = 0.0
     
-    # Apply severity multiplier based on highest severity triggered
-    max_severity = _get_max_severity(detections)
-    multiplier = SEVERITY_MULTIPLIERS.get(max_severity, 1.0)
+    # Apply severity multiplier based on highest severity triggered; other
+    # entries (e.g. a honeypot detection) count toward it too
+    if len(detections) > seen:
+        max_rank = max(max_rank, max(map(_severity_rank, detections.values())))
+    multiplier = SEVERITY_MULTIPLIERS.get(_SEVERITY_NAMES[max_rank], 1.0)
     final_score = min(raw_score * multiplier, 100)
     
-    # Determine severity
-    severity = Severity(score_to_severity(final_score))
-    
-    # Determine decision
-    if final_score >= THRESHOLDS['block']:
-        decision = ActionDecision.BLOCK
-    elif final_score >= THRESHOLDS['confirm']:
-        decision = ActionDecision.REQUIRE_CONFIRMATION
-    else:
-        decision = ActionDecision.ALLOW
-    
-    # Calculate trust delta
-    if final_score >= 70:
-        trust_delta = -30
-    elif final_score >= 50:
-        trust_delta = -15
-    elif final_score >= 30:
-        trust_delta = -5
-    else:
-        trust_delta = 0
+    # Severity, decision and trust delta by score band
+    severity = _SEVERITIES[bisect_right(_SEVERITY_THRESHOLDS, final_score)]
+    decision = _DECISIONS[bisect_right(_DECISION_THRESHOLDS, final_score)]
+    trust_delta = _TRUST_DELTAS[bisect_right(_TRUST_DELTA_THRESHOLDS, final_score)]
     
     # Generate explanation
     explanation = _generate_explanation(breakdown, triggered_modules, final_score)
@@ -245,19 +191,62 @@ def _get_detection_score(detection: Any) -> float:
     return 0
 
 
-def _get_max_severity(detections: Dict[str, Any]) -> str:
-    """Get highest severity from all detections"""
-    severities = ['INFO', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
-    max_index = 0
-    
-    for detection in detections.values():
-        if hasattr(detection, 'severity'):
-            sev = detection.severity.value if hasattr(detection.severity, 'value') else str(detection.severity)
-            if sev in severities:
-                idx = severities.index(sev)
-                max_index = max(max_index, idx)
-    
-    return severities[max_index]
+def _shadow_dom_score(shadow_dom: Any) -> float:
+    """Score a DOMScanResult by threat count, or a plain detection by its score"""
+    if hasattr(shadow_dom, 'threats'):
+        return min(len(shadow_dom.threats) * 20, 100) if shadow_dom.threats else 0
+    return _get_detection_score(shadow_dom)
+
+
+def _semantic_score(semantic: Any) -> float:
+    """Divergence score from a SemanticAnalysis or its dict form"""
+    if hasattr(semantic, 'divergence_score'):
+        return semantic.divergence_score
+    return semantic.get('divergence_score', 0) if isinstance(semantic, dict) else 0
+
+
+def _hallucination_score(hallucination: Any) -> float:
+    """Fixed score for a confirmed hallucination (HallucinationCheck or dict)"""
+    if hasattr(hallucination, 'is_hallucination'):
+        return 80 if hallucination.is_hallucination else 0
+    return 80 if hallucination.get('is_hallucination', False) else 0
+
+
+# (detections key, breakdown field / RISK_WEIGHTS key / module name,
+#  score extractor, score the module must exceed to count), in report order
+_RISK_FIELDS = (
+    ('prompt_injection', 'prompt_injection', _get_detection_score, 0),
+    ('hidden_content', 'hidden_content', _get_detection_score, 0),
+    ('deceptive_ui', 'deceptive_ui', _get_detection_score, 0),
+    ('dynamic_injection', 'dynamic_injection', _get_detection_score, 0),
+    ('shadow_dom', 'shadow_dom', _shadow_dom_score, 0),
+    ('semantic', 'semantic_drift', _semantic_score, 20),
+    ('hallucination', 'hallucination', _hallucination_score, 0),
+)
+
+
+_SEVERITY_NAMES = ('INFO', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+_SEVERITY_RANK = {name: rank for rank, name in enumerate(_SEVERITY_NAMES)}
+
+
+def _severity_rank(detection: Any) -> int:
+    """Rank of a detection's severity (INFO = 0 when it has none)"""
+    if not hasattr(detection, 'severity'):
+        return 0
+    severity = detection.severity
+    return _SEVERITY_RANK.get(severity.value if hasattr(severity, 'value') else str(severity), 0)
+
+
+# (breakdown field, explanation text, score it must exceed, show the score?),
+# in explanation order
+_EXPLANATIONS = (
+    ('prompt_injection', "Prompt injection risk", 30, True),
+    ('hidden_content', "Hidden malicious content", 30, True),
+    ('deceptive_ui', "Deceptive UI elements", 30, True),
+    ('semantic_drift', "Intent/action mismatch", 30, True),
+    ('hallucination', "Agent hallucination detected", 0, False),
+    ('policy_violation', "Policy violations present", 0, False),
+)
 
 
 def _generate_explanation(
@@ -271,18 +260,10 @@ def _generate_explanation(
     
     parts = []
     
-    if breakdown.prompt_injection > 30:
-        parts.append(f"Prompt injection risk ({breakdown.prompt_injection:.0f}%)")
-    if breakdown.hidden_content > 30:
-        parts.append(f"Hidden malicious content ({breakdown.hidden_content:.0f}%)")
-    if breakdown.deceptive_ui > 30:
-        parts.append(f"Deceptive UI elements ({breakdown.deceptive_ui:.0f}%)")
-    if breakdown.semantic_drift > 30:
-        parts.append(f"Intent/action mismatch ({breakdown.semantic_drift:.0f}%)")
-    if breakdown.hallucination > 0:
-        parts.append("Agent hallucination detected")
-    if breakdown.policy_violation > 0:
-        parts.append("Policy violations present")
+    for field_name, text, shown_above, with_score in _EXPLANATIONS:
+        value = getattr(breakdown, field_name)
+        if value > shown_above:
+            parts.append(f"{text} ({value:.0f}%)" if with_score else text)
     
     if not parts:
         parts.append(f"Minor risks detected (score: {score:.0f})")
@@ -300,11 +281,7 @@ def quick_risk_check(detections: Dict[str, Any]) -> bool:
     
     Returns True if action should proceed, False if blocked.
     """
-    for key, detection in detections.items():
-        score = _get_detection_score(detection)
-        if score >= 70:
-            return False
-    return True
+    return not any(_get_detection_score(detection) >= 70 for detection in detections.values())
 
 
 # ============================================
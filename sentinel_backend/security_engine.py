@@ -12,11 +12,122 @@ Target latency: <20ms per detection.
 """
 
 import re
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from sentinel_backend.models import DetectionResult, ThreatType, Severity, DOMNode
 from sentinel_backend.utils import logger, Timer, normalize_text
 
+try:
+    import ahocorasick
+except ImportError:
+    # Fallback to one substring check per keyword
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:
+    # Fallback to one regex search per pattern
+    hyperscan = None
+
+
+# ============================================
+# PATTERN SETS
+# ============================================
+
+# Python's \s on ASCII text (hyperscan's \s leaves out \x1c-\x1f)
+_ASCII_WHITESPACE_CLASS = r'[\t\n\x0b\x0c\r\x1c-\x1f ]'
+
+# Hyperscan scratch space is per thread (detections may run in the
+# threadpool); keyed by database id
+_hyperscan_local = threading.local()
+
+
+def _compile_hyperscan_database(patterns: Sequence[str]):
+    """
+    One hyperscan database over the lowercased patterns (ids are pattern
+    indexes), for lowercased ASCII text. None if hyperscan is unavailable
+    or rejects a pattern.
+    """
+    if hyperscan is None:
+        return None
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[
+                pattern.lower().replace(r'\s', _ASCII_WHITESPACE_CLASS).encode('ascii')
+                for pattern in patterns
+            ],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+        )
+    except hyperscan.error as e:
+        logger.warning(f"[SECURITY] hyperscan unavailable for pattern set, using re: {e}")
+        return None
+    return database
+
+
+def _hyperscan_matches(database, text: str) -> List[int]:
+    """Indexes (in pattern order) of the patterns hyperscan finds in text"""
+    scratches = getattr(_hyperscan_local, 'scratches', None)
+    if scratches is None:
+        scratches = _hyperscan_local.scratches = {}
+    scratch = scratches.get(id(database))
+    if scratch is None:
+        scratch = scratches[id(database)] = hyperscan.Scratch(database)
+    
+    hits = []
+    database.scan(
+        text.encode('ascii'),
+        match_event_handler=lambda pattern_id, start, end, flags, context: hits.append(pattern_id),
+        scratch=scratch
+    )
+    return sorted(hits)
+
+
+def _compile_pattern_set(patterns: Sequence[str]) -> Tuple[Tuple[re.Pattern, ...], Tuple[re.Pattern, ...], Any]:
+    """
+    Compile patterns for case-insensitive search, twice: lowercased and
+    case-sensitive (for lowercased ASCII text), and as written with
+    re.IGNORECASE (for everything else). With hyperscan installed the
+    lowercased patterns are also compiled into one database, so ASCII text
+    is matched against the whole set in a single scan.
+    
+    Case-insensitive matching disables the regex engine's prefix scans, so
+    the lowercased form is several times faster; lowercasing a pattern is
+    only safe because none of them use uppercase escapes (\\S, \\W, ...).
+    """
+    for pattern in patterns:
+        if re.search(r'\\[A-Z]', pattern):
+            raise ValueError(f"Uppercase escape in detection pattern: {pattern}")
+    
+    return (
+        tuple(re.compile(pattern.lower()) for pattern in patterns),
+        tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns),
+        _compile_hyperscan_database(patterns)
+    )
+
+
+def _matching_patterns(
+    text: str,
+    pattern_set: Tuple[Tuple[re.Pattern, ...], Tuple[re.Pattern, ...], Any]
+) -> List[int]:
+    """Indexes (in pattern order) of the patterns that match anywhere in text"""
+    lowered, ignorecase, database = pattern_set
+    if text.isascii():
+        # ASCII case folding is exactly lower(); Unicode folding (e.g. the
+        # Kelvin sign matching 'k') needs the IGNORECASE patterns
+        text = text.lower()
+        if database is not None:
+            return _hyperscan_matches(database, text)
+        compiled = lowered
+    else:
+        compiled = ignorecase
+    return [i for i, pattern in enumerate(compiled) if pattern.search(text)]
+
 
 # ============================================
 # PROMPT INJECTION DETECTION
@@ -69,6 +180,33 @@ INJECTION_KEYWORDS = [
     "shell command",
     "terminal command"
 ]
+_INJECTION_KEYWORDS_LOWER = tuple(keyword.lower() for keyword in INJECTION_KEYWORDS)
+
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton over the keywords (values are keyword indexes)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for i, keyword in enumerate(_INJECTION_KEYWORDS_LOWER):
+        automaton.add_word(keyword, i)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _matching_keywords(normalized: str) -> List[int]:
+    """
+    Indexes (in keyword order) of the keywords that occur in normalized text.
+    
+    The automaton finds every occurrence, overlapping ones included, in one
+    pass; without it each keyword is a separate substring scan.
+    """
+    if _KEYWORD_AUTOMATON is not None:
+        return sorted({i for _, i in _KEYWORD_AUTOMATON.iter(normalized)})
+    return [i for i, keyword in enumerate(_INJECTION_KEYWORDS_LOWER) if keyword in normalized]
 
 # Regex patterns for more complex injection attempts
 INJECTION_PATTERNS = [
@@ -80,6 +218,35 @@ INJECTION_PATTERNS = [
     r'\[SYSTEM\]|\[ADMIN\]|\[OVERRIDE\]|\[IGNORE\]',
     r'<\s*/?(?:system|admin|override|ignore)\s*>',
 ]
+_INJECTION_PATTERN_SET = _compile_pattern_set(INJECTION_PATTERNS)
+
+# Every injection pattern needs at least one of these substrings in the
+# lowercased text; keep in sync when adding patterns
+_INJECTION_PATTERN_ANCHORS = (
+    "ignore", "disregard", "forget", "override",
+    "you", "act", "pretend",
+    "instruction",
+    "reveal", "show", "print", "output", "display",
+    "execute", "run",
+    "[", "<",
+)
+
+
+def _may_match_injection_patterns(text: str) -> bool:
+    """
+    Cheap pre-check before the injection regex sweep.
+    
+    Only ASCII text is triaged: Unicode case folding can match the
+    patterns without any anchor appearing in lower().
+    """
+    if not text.isascii():
+        return True
+    lowered = text.lower()
+    return any(anchor in lowered for anchor in _INJECTION_PATTERN_ANCHORS)
+
+# Severity by score: level i applies from threshold i-1 (inclusive) up
+_INJECTION_SEVERITY_THRESHOLDS = (20, 30, 50, 70)
+_INJECTION_SEVERITIES = (Severity.INFO, Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
 
 
 def detect_prompt_injection(text: str) -> DetectionResult:
@@ -89,25 +256,24 @@ def detect_prompt_injection(text: str) -> DetectionResult:
     Uses keyword matching and regex patterns for speed.
     Returns detection result with score and matches.
     """
-    start = time.perf_counter()
-    
     if not text:
-        return DetectionResult(latency_ms=(time.perf_counter() - start) * 1000)
+        return DetectionResult()
+    
+    start = time.perf_counter()
     
     normalized = normalize_text(text)
     matches = []
     score = 0.0
     
     # Check keywords (fast)
-    for keyword in INJECTION_KEYWORDS:
-        if keyword.lower() in normalized:
-            matches.append(f"keyword: {keyword}")
-            score += 15
-    
-    # Check regex patterns
-    for pattern in INJECTION_PATTERNS:
-        if re.search(pattern, text, re.IGNORECASE):
-            matches.append(f"pattern: {pattern[:30]}...")
+    for i in _matching_keywords(normalized):
+        matches.append(f"keyword: {INJECTION_KEYWORDS[i]}")
+        score += 15
+    
+    # Check regex patterns (skipped for benign text no pattern can match)
+    if _may_match_injection_patterns(text):
+        for i in _matching_patterns(text, _INJECTION_PATTERN_SET):
+            matches.append(f"pattern: {INJECTION_PATTERNS[i][:30]}...")
             score += 20
     
     # Check for suspicious characters often used in injections
@@ -122,17 +288,7 @@ def detect_prompt_injection(text: str) -> DetectionResult:
     score = min(score, 100)
     detected = score >= 20
     
-    # Determine severity
-    if score >= 70:
-        severity = Severity.CRITICAL
-    elif score >= 50:
-        severity = Severity.HIGH
-    elif score >= 30:
-        severity = Severity.MEDIUM
-    elif score >= 20:
-        severity = Severity.LOW
-    else:
-        severity = Severity.INFO
+    severity = _INJECTION_SEVERITIES[bisect_right(_INJECTION_SEVERITY_THRESHOLDS, score)]
     
     latency = (time.perf_counter() - start) * 1000
     
@@ -165,6 +321,40 @@ HIDDEN_CSS_PATTERNS = [
     (r'clip\s*:\s*rect\s*\(\s*0', 25),
     (r'text-indent\s*:\s*-\d{4,}', 30),
 ]
+_HIDDEN_CSS_PATTERN_SET = _compile_pattern_set([p for p, _ in HIDDEN_CSS_PATTERNS])
+
+# Class names that hide content (substring match against the class list)
+HIDDEN_CLASS_PATTERNS = ('hidden', 'invisible', 'sr-only', 'visually-hidden', 'offscreen')
+
+
+
+@lru_cache(maxsize=4096)
+def _hidden_css_hits(style: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    (reason, weight) for each hiding pattern in an inline style.
+    
+    Cached by style text: pages repeat the same few styles across many
+    nodes, so each distinct style is matched against the patterns once.
+    """
+    return tuple(
+        (f"CSS: {HIDDEN_CSS_PATTERNS[i][0][:20]}...", HIDDEN_CSS_PATTERNS[i][1])
+        for i in _matching_patterns(style, _HIDDEN_CSS_PATTERN_SET)
+    )
+
+
+@lru_cache(maxsize=4096)
+def _is_injection_text(text: str) -> bool:
+    """
+    Whether detect_prompt_injection flags this text.
+    
+    Cached by text: templated pages repeat the same hidden banners and
+    labels across many nodes, so each distinct string is scanned once.
+    """
+    return detect_prompt_injection(text).detected
+
+
+_HIDDEN_SEVERITY_THRESHOLDS = (30, 50, 70)
+_HIDDEN_SEVERITIES = (Severity.INFO, Severity.LOW, Severity.MEDIUM, Severity.HIGH)
 
 
 def detect_hidden_content(dom_tree: Dict[str, Any]) -> DetectionResult:
@@ -173,10 +363,10 @@ def detect_hidden_content(dom_tree: Dict[str, Any]) -> DetectionResult:
     
     Recursively scans DOM for hidden elements with text content.
     """
-    start = time.perf_counter()
-    
     if not dom_tree:
-        return DetectionResult(latency_ms=(time.perf_counter() - start) * 1000)
+        return DetectionResult()
+    
+    start = time.perf_counter()
     
     flagged_nodes = []
     total_score = 0
@@ -188,30 +378,29 @@ def detect_hidden_content(dom_tree: Dict[str, Any]) -> DetectionResult:
             return
         
         style = node.get('style', '') or ''
-        classes = ' '.join(node.get('classes', []))
+        classes = node.get('classes')
         text = node.get('text', '') or ''
         
         node_score = 0
         node_reasons = []
         
         # Check CSS for hiding patterns
-        for pattern, weight in HIDDEN_CSS_PATTERNS:
-            if re.search(pattern, style, re.IGNORECASE):
-                node_score += weight
-                node_reasons.append(f"CSS: {pattern[:20]}...")
+        for reason, weight in _hidden_css_hits(style):
+            node_score += weight
+            node_reasons.append(reason)
         
-        # Check for suspicious class names
-        hidden_class_patterns = ['hidden', 'invisible', 'sr-only', 'visually-hidden', 'offscreen']
-        for pattern in hidden_class_patterns:
-            if pattern in classes.lower():
-                node_score += 20
-                node_reasons.append(f"Class: {pattern}")
+        # Check for suspicious class names (most nodes have none)
+        if classes:
+            classes = ' '.join(classes).lower()
+            for pattern in HIDDEN_CLASS_PATTERNS:
+                if pattern in classes:
+                    node_score += 20
+                    node_reasons.append(f"Class: {pattern}")
         
         # Only flag if node has significant text
         if node_score > 0 and len(text.strip()) > 10:
             # Check if text contains suspicious content
-            text_injection = detect_prompt_injection(text)
-            if text_injection.detected:
+            if _is_injection_text(text):
                 node_score += 30
                 node_reasons.append("Contains injection attempt")
             
@@ -236,14 +425,7 @@ def detect_hidden_content(dom_tree: Dict[str, Any]) -> DetectionResult:
     
     detected = total_score >= 30
     
-    if total_score >= 70:
-        severity = Severity.HIGH
-    elif total_score >= 50:
-        severity = Severity.MEDIUM
-    elif total_score >= 30:
-        severity = Severity.LOW
-    else:
-        severity = Severity.INFO
+    severity = _HIDDEN_SEVERITIES[bisect_right(_HIDDEN_SEVERITY_THRESHOLDS, total_score)]
     
     latency = (time.perf_counter() - start) * 1000
     
@@ -265,14 +447,37 @@ def detect_hidden_content(dom_tree: Dict[str, Any]) -> DetectionResult:
 # DECEPTIVE UI DETECTION
 # ============================================
 
+# Overlay checks, compiled once rather than looked up per node
+_FIXED_POSITION_RE = re.compile(r'position\s*:\s*fixed', re.IGNORECASE)
+_HIGH_Z_INDEX_RE = re.compile(r'z-index\s*:\s*(\d{4,}|9999)', re.IGNORECASE)
+_PINNED_ORIGIN_RE = re.compile(r'(?:top|left)\s*:\s*0', re.IGNORECASE)
+_ZERO_OPACITY_RE = re.compile(r'opacity\s*:\s*0')
+
+
+
+@lru_cache(maxsize=4096)
+def _overlay_style_flags(style: str) -> Tuple[bool, bool]:
+    """(pinned full-screen fixed overlay, zero opacity) for an inline style, cached by style text"""
+    fullscreen = bool(
+        _FIXED_POSITION_RE.search(style)
+        and _HIGH_Z_INDEX_RE.search(style)
+        and _PINNED_ORIGIN_RE.search(style)
+    )
+    return fullscreen, bool(_ZERO_OPACITY_RE.search(style))
+
+
+_DECEPTIVE_SEVERITY_THRESHOLDS = (30, 40, 60)
+_DECEPTIVE_SEVERITIES = (Severity.INFO, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
+
+
 def detect_deceptive_ui(dom_tree: Dict[str, Any]) -> DetectionResult:
     """
     Detect deceptive UI elements like overlays, fake forms, and clickjacking.
     """
-    start = time.perf_counter()
-    
     if not dom_tree:
-        return DetectionResult(latency_ms=(time.perf_counter() - start) * 1000)
+        return DetectionResult()
+    
+    start = time.perf_counter()
     
     issues = []
     score = 0
@@ -287,26 +492,25 @@ def detect_deceptive_ui(dom_tree: Dict[str, Any]) -> DetectionResult:
         tag = node.get('tag', '').lower()
         attrs = node.get('attributes', {})
         
+        fullscreen, zero_opacity = _overlay_style_flags(style)
+        
         # Check for fullscreen overlays
-        if re.search(r'position\s*:\s*fixed', style, re.IGNORECASE):
-            if re.search(r'z-index\s*:\s*(\d{4,}|9999)', style, re.IGNORECASE):
-                if re.search(r'(?:top|left)\s*:\s*0', style, re.IGNORECASE):
-                    issues.append({
-                        'type': 'FULLSCREEN_OVERLAY',
-                        'id': node.get('id'),
-                        'severity': 'HIGH'
-                    })
-                    score += 40
+        if fullscreen:
+            issues.append({
+                'type': 'FULLSCREEN_OVERLAY',
+                'id': node.get('id'),
+                'severity': 'HIGH'
+            })
+            score += 40
         
-        # Check for invisible overlays
-        if 'overlay' in ' '.join(node.get('classes', [])).lower():
-            if re.search(r'opacity\s*:\s*0', style):
-                issues.append({
-                    'type': 'INVISIBLE_OVERLAY',
-                    'id': node.get('id'),
-                    'severity': 'HIGH'
-                })
-                score += 35
+        # Check for invisible overlays (style test first: it is cached)
+        if zero_opacity and 'overlay' in ' '.join(node.get('classes', [])).lower():
+            issues.append({
+                'type': 'INVISIBLE_OVERLAY',
+                'id': node.get('id'),
+                'severity': 'HIGH'
+            })
+            score += 35
         
         # Check for suspicious forms
         if tag == 'form':
@@ -341,11 +545,7 @@ def detect_deceptive_ui(dom_tree: Dict[str, Any]) -> DetectionResult:
     scan_node(dom_tree)
     
     detected = score >= 30
-    severity = Severity.CRITICAL if score >= 60 else (
-        Severity.HIGH if score >= 40 else (
-            Severity.MEDIUM if score >= 30 else Severity.INFO
-        )
-    )
+    severity = _DECEPTIVE_SEVERITIES[bisect_right(_DECEPTIVE_SEVERITY_THRESHOLDS, score)]
     
     latency = (time.perf_counter() - start) * 1000
     
@@ -382,6 +582,31 @@ JS_INJECTION_PATTERNS = [
     (r'fromCharCode', 30),
     (r'\\x[0-9a-f]{2}|\\u[0-9a-f]{4}', 20),  # Encoded characters
 ]
+_JS_INJECTION_PATTERN_SET = _compile_pattern_set([p for p, _ in JS_INJECTION_PATTERNS])
+
+# Hex/unicode escapes, counted for the obfuscation ratio
+_ENCODED_CHAR_RE = re.compile(r'\\[xu][0-9a-f]+')
+
+
+def _has_line_longer_than(text: str, limit: int) -> bool:
+    """
+    Whether any newline-separated line of text is longer than limit.
+    
+    Looks for the last newline in each limit+1 window instead of splitting,
+    so a window without one is a long line and a hit skips every line in
+    the window at once.
+    """
+    end = len(text)
+    start = 0
+    while end - start > limit:
+        newline = text.rfind('\n', start, start + limit + 1)
+        if newline == -1:
+            return True
+        start = newline + 1
+    return False
+
+_JS_SEVERITY_THRESHOLDS = (20, 40, 60)
+_JS_SEVERITIES = (Severity.INFO, Severity.LOW, Severity.MEDIUM, Severity.HIGH)
 
 
 def detect_dynamic_injection(script_content: str) -> DetectionResult:
@@ -390,37 +615,34 @@ def detect_dynamic_injection(script_content: str) -> DetectionResult:
     
     Looks for dynamic code execution, obfuscation, and data exfiltration.
     """
-    start = time.perf_counter()
-    
     if not script_content:
-        return DetectionResult(latency_ms=(time.perf_counter() - start) * 1000)
+        return DetectionResult()
+    
+    start = time.perf_counter()
     
     matches = []
     score = 0
     
-    for pattern, weight in JS_INJECTION_PATTERNS:
-        if re.search(pattern, script_content, re.IGNORECASE):
-            matches.append(pattern[:30])
-            score += weight
+    for i in _matching_patterns(script_content, _JS_INJECTION_PATTERN_SET):
+        pattern, weight = JS_INJECTION_PATTERNS[i]
+        matches.append(pattern[:30])
+        score += weight
     
     # Check for highly obfuscated code
     if len(script_content) > 100:
         # High ratio of hex/unicode escapes
-        encoded_ratio = len(re.findall(r'\\[xu][0-9a-f]+', script_content)) / len(script_content)
+        encoded_ratio = len(_ENCODED_CHAR_RE.findall(script_content)) / len(script_content)
         if encoded_ratio > 0.1:
             score += 30
             matches.append("High encoded character ratio")
         
         # Very long single lines (minified/obfuscated)
-        lines = script_content.split('\n')
-        if any(len(line) > 1000 for line in lines):
+        if _has_line_longer_than(script_content, 1000):
             score += 15
             matches.append("Heavily minified code")
     
     detected = score >= 40
-    severity = Severity.HIGH if score >= 60 else (
-        Severity.MEDIUM if score >= 40 else Severity.LOW if score >= 20 else Severity.INFO
-    )
+    severity = _JS_SEVERITIES[bisect_right(_JS_SEVERITY_THRESHOLDS, score)]
     
     latency = (time.perf_counter() - start) * 1000
     
@@ -112,6 +112,17 @@ async def shadow_dom_xray(page) -> List[Dict[str, Any]]:
         () => {
             const results = [];
             
+            const suspicious = [
+                'ignore previous',
+                'system override',
+                'new instructions',
+                'click here to',
+                'transfer funds'
+            ];
+            // One scan per node; the u flag folds case like toLowerCase()
+            // does for these phrases (e.g. the Kelvin sign in 'clicK')
+            const suspiciousRe = new RegExp(suspicious.join('|'), 'iu');
+            
             function isHidden(element) {
                 if (!element || !element.style) return false;
                 const style = window.getComputedStyle(element);
@@ -125,7 +136,10 @@ async def shadow_dom_xray(page) -> List[Dict[str, Any]]:
                 );
             }
             
-            function crawl(node, depth = 0) {
+            // mayMatch is false once an ancestor's textContent had no
+            // suspicious phrase: a child's text is a substring of its
+            // parent's, so its subtree cannot have one either
+            function crawl(node, depth = 0, mayMatch = true) {
                 if (!node || depth > 50) return;
                 
                 // Check text nodes
@@ -147,18 +161,15 @@ async def shadow_dom_xray(page) -> List[Dict[str, Any]]:
                 }
                 
                 // Check for suspicious patterns in visible text too
-                if (node.nodeType === Node.ELEMENT_NODE) {
+                if (mayMatch && node.nodeType === Node.ELEMENT_NODE) {
                     const text = node.textContent || '';
-                    const suspicious = [
-                        'ignore previous',
-                        'system override',
-                        'new instructions',
-                        'click here to',
-                        'transfer funds'
-                    ];
+                    mayMatch = suspiciousRe.test(text);
                     
-                    for (const pattern of suspicious) {
-                        if (text.toLowerCase().includes(pattern)) {
+                    // Report the first phrase in list order, as before
+                    if (mayMatch) {
+                        const lower = text.toLowerCase();
+                        const pattern = suspicious.find(p => lower.includes(p));
+                        if (pattern) {
                             results.push({
                                 type: 'suspicious_content',
                                 pattern: pattern,
@@ -167,12 +178,11 @@ async def shadow_dom_xray(page) -> List[Dict[str, Any]]:
                                 tag: node.tagName,
                                 depth: depth
                             });
-                            break;
                         }
                     }
                 }
                 
-                // Crawl shadow root
+                // Crawl shadow root (not part of the host's textContent)
                 if (node.shadowRoot) {
                     for (const child of node.shadowRoot.childNodes) {
                         crawl(child, depth + 1);
@@ -181,7 +191,7 @@ async def shadow_dom_xray(page) -> List[Dict[str, Any]]:
                 
                 // Crawl children
                 for (const child of node.childNodes || []) {
-                    crawl(child, depth + 1);
+                    crawl(child, depth + 1, mayMatch);
                 }
             }
             
@@ -195,13 +205,13 @@ async def shadow_dom_xray(page) -> List[Dict[str, Any]]:
 # DEFENSE C: SEMANTIC FIREWALL
 # ============================================
 
-# Dangerous action patterns
+# Dangerous action patterns (matched against the lowercased action)
 DANGER_PATTERNS = [
-    (r'transfer|send\s+money|wire', 'financial_transfer'),
-    (r'password|credential|login', 'authentication'),
-    (r'delete|remove|destroy', 'destructive'),
-    (r'download|export|extract', 'data_exfiltration'),
-    (r'admin|root|sudo|override', 'privilege_escalation'),
+    (re.compile(r'transfer|send\s+money|wire'), 'financial_transfer'),
+    (re.compile(r'password|credential|login'), 'authentication'),
+    (re.compile(r'delete|remove|destroy'), 'destructive'),
+    (re.compile(r'download|export|extract'), 'data_exfiltration'),
+    (re.compile(r'admin|root|sudo|override'), 'privilege_escalation'),
 ]
 
 # Intent-action mismatches that indicate hijacking
@@ -244,7 +254,7 @@ async def assess_action_risk(
     
     # Check for dangerous patterns in action
     for pattern, category in DANGER_PATTERNS:
-        if re.search(pattern, action_lower):
+        if pattern.search(action_lower):
             risk_score += 25
             reasons.append(f"Dangerous action detected: {category}")
     
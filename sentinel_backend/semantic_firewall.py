@@ -16,6 +16,12 @@ from typing import Dict, List, Optional, Any
 from sentinel_backend.models import SemanticAnalysis, ActionDecision, Severity
 from sentinel_backend.utils import logger, normalize_text, extract_keywords
 
+try:
+    import ahocorasick
+except ImportError:
+    # Fallback to one substring check per keyword
+    ahocorasick = None
+
 
 # ============================================
 # ACTION CATEGORIES
@@ -41,6 +47,34 @@ SUSPICIOUS_TRANSITIONS = [
 ]
 
 
+def _build_category_automaton():
+    """
+    Aho-Corasick automaton over every category keyword (values are the
+    indexes, in ACTION_CATEGORIES order, of the categories listing it)
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for i, keywords in enumerate(ACTION_CATEGORIES.values()):
+        for keyword in keywords:
+            automaton.add_word(keyword, automaton.get(keyword, ()) + (i,))
+    automaton.make_automaton()
+    return automaton
+
+
+_CATEGORY_NAMES = tuple(ACTION_CATEGORIES)
+_CATEGORY_AUTOMATON = _build_category_automaton()
+
+# Dangerous patterns in an action (pattern, weight, flag); only counted
+# when the intent does not mention the same thing
+DANGEROUS_ACTION_PATTERNS = [
+    (re.compile(r'transfer.*\$?\d+', re.IGNORECASE), 40, "Financial transfer detected"),
+    (re.compile(r'password|credential', re.IGNORECASE), 30, "Credential access detected"),
+    (re.compile(r'delete|remove|cancel', re.IGNORECASE), 25, "Destructive action detected"),
+    (re.compile(r'download|export|extract', re.IGNORECASE), 20, "Data exfiltration detected"),
+]
+
+
 # ============================================
 # SEMANTIC ANALYSIS
 # ============================================
@@ -52,6 +86,14 @@ def categorize_text(text: str) -> List[str]:
     Returns list of matching categories.
     """
     text_lower = normalize_text(text)
+    
+    # One pass over the text finds every keyword of every category
+    if _CATEGORY_AUTOMATON is not None:
+        found = set()
+        for _, indexes in _CATEGORY_AUTOMATON.iter(text_lower):
+            found.update(indexes)
+        return [name for i, name in enumerate(_CATEGORY_NAMES) if i in found]
+    
     categories = []
     
     for category, keywords in ACTION_CATEGORIES.items():
@@ -152,16 +194,9 @@ def semantic_check(
     # Additional checks
     
     # Check for specific dangerous patterns in action
-    dangerous_patterns = [
-        (r'transfer.*\$?\d+', 40, "Financial transfer detected"),
-        (r'password|credential', 30, "Credential access detected"),
-        (r'delete|remove|cancel', 25, "Destructive action detected"),
-        (r'download|export|extract', 20, "Data exfiltration detected"),
-    ]
-    
-    for pattern, weight, flag in dangerous_patterns:
-        if re.search(pattern, action, re.IGNORECASE):
-            if not re.search(pattern, intent, re.IGNORECASE):
+    for pattern, weight, flag in DANGEROUS_ACTION_PATTERNS:
+        if pattern.search(action):
+            if not pattern.search(intent):
                 divergence += weight
                 flags.append(flag)
     
@@ -25,10 +25,10 @@ import time
 import asyncio
 import random
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
-from sentinel_backend.services.risk_engine import risk_engine, RiskLevel
+from sentinel_backend.services.risk_engine import risk_engine, RiskAssessment, RiskLevel
 from sentinel_backend.services.trust_engine import trust_engine, TrustEvent
 from sentinel_backend.services.forensics_engine import forensics_engine, SnapshotType
 from sentinel_backend.services.ws_orchestrator import ws_orchestrator, EventType
@@ -207,7 +207,8 @@ class DemoEngineService:
         attack_type: AttackType,
         session_id: str,
         real_time: bool = True,
-        step_delay_ms: int = 500
+        step_delay_ms: int = 500,
+        risk_cache: Optional[Dict[str, RiskAssessment]] = None
     ) -> DemoResult:
         """
         Run a complete attack scenario with real-time event emission.
@@ -217,6 +218,7 @@ class DemoEngineService:
             session_id: Session to emit events to
             real_time: If True, add delays between steps
             step_delay_ms: Delay between steps
+            risk_cache: threat -> assessment shared by scenarios in one run
         
         Returns:
             DemoResult with full timeline
@@ -245,7 +247,8 @@ class DemoEngineService:
                 step_result = await self._execute_step(
                     step,
                     session_id,
-                    scenario
+                    scenario,
+                    risk_cache
                 )
                 
                 timeline.append(step_result)
@@ -284,7 +287,8 @@ class DemoEngineService:
         self,
         step: Dict[str, Any],
         session_id: str,
-        scenario: AttackScenario
+        scenario: AttackScenario,
+        risk_cache: Optional[Dict[str, RiskAssessment]] = None
     ) -> Dict[str, Any]:
         """Execute a single demo step"""
         action = step.get("action")
@@ -310,12 +314,19 @@ class DemoEngineService:
                 details={"pattern": pattern}
             )
             
-            # Calculate risk
-            risk = risk_engine.calculate_risk(
-                injection_result={"detected": True, "score": 80} if threat == "prompt_injection" else None,
-                hidden_content_result={"detected": True, "score": 60} if threat == "hidden_content" else None,
-                deceptive_ui_result={"detected": True, "score": 70} if threat == "deceptive_ui" else None
-            )
+            # Calculate risk (depends only on the threat, so reuse within a run)
+            risk = risk_cache.get(threat) if risk_cache is not None else None
+            if risk is None:
+                risk = risk_engine.calculate_risk(
+                    injection_result={"detected": True, "score": 80} if threat == "prompt_injection" else None,
+                    hidden_content_result={"detected": True, "score": 60} if threat == "hidden_content" else None,
+                    deceptive_ui_result={"detected": True, "score": 70} if threat == "deceptive_ui" else None
+                )
+                if risk_cache is not None:
+                    risk_cache[threat] = risk
+            else:
+                # Still record a fresh point so risk evolution stays complete
+                risk = risk_engine.record(replace(risk, timestamp=time.time()))
             
             await ws_orchestrator.emit_risk_update(
                 session_id,
@@ -405,16 +416,21 @@ class DemoEngineService:
     ) -> Dict[str, DemoResult]:
         """Run all attack scenarios sequentially"""
         results = {}
+        risk_cache: Dict[str, RiskAssessment] = {}
         
-        for attack_type in AttackType:
-            result = await self.run_scenario(
-                attack_type,
-                session_id,
-                real_time=True
-            )
-            results[attack_type.value] = result
-            
-            await asyncio.sleep(delay_between_ms / 1000)
+        try:
+            for attack_type in AttackType:
+                result = await self.run_scenario(
+                    attack_type,
+                    session_id,
+                    real_time=True,
+                    risk_cache=risk_cache
+                )
+                results[attack_type.value] = result
+                
+                await asyncio.sleep(delay_between_ms / 1000)
+        finally:
+            risk_cache.clear()
         
         return results
     
@@ -22,10 +22,11 @@ import time
 import json
 import re
 import fnmatch
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Pattern, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
+from urllib.parse import urlparse
 
 
 class PolicyDecision(str, Enum):
@@ -62,6 +63,26 @@ class PolicyConfig:
     blocked_actions: List[str] = field(default_factory=list)
     sensitive_selectors: List[str] = field(default_factory=list)
     
+    # Matchers derived from the lists above, compiled once per policy version
+    blocked_domain_matchers: Tuple[Tuple[str, Pattern], ...] = field(init=False, repr=False, compare=False)
+    allowed_domain_matchers: Tuple[Pattern, ...] = field(init=False, repr=False, compare=False)
+    blocked_action_needles: Tuple[Tuple[str, str], ...] = field(init=False, repr=False, compare=False)
+    sensitive_selector_needles: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    confirmation_needles: Tuple[Tuple[str, str], ...] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.blocked_domain_matchers = tuple(
+            (p, re.compile(fnmatch.translate(p.lower()))) for p in self.blocked_domains
+        )
+        self.allowed_domain_matchers = tuple(
+            re.compile(fnmatch.translate(p.lower())) for p in self.allowed_domains
+        )
+        self.blocked_action_needles = tuple((p, p.lower()) for p in self.blocked_actions)
+        self.sensitive_selector_needles = tuple(
+            s.replace("[", "").replace("]", "") for s in self.sensitive_selectors
+        )
+        self.confirmation_needles = tuple((p, p.lower()) for p in self.require_confirmation_for)
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             "version": self.version,
@@ -248,8 +269,8 @@ class PolicyEngineService:
         
         # Check 3: Blocked action patterns
         action_text = json.dumps(action).lower()
-        for pattern in policy.blocked_actions:
-            if pattern.lower() in action_text:
+        for pattern, needle in policy.blocked_action_needles:
+            if needle in action_text:
                 return PolicyEvaluation(
                     decision=PolicyDecision.BLOCK,
                     allowed=False,
@@ -260,9 +281,9 @@ class PolicyEngineService:
         
         # Check 4: Sensitive selectors
         selector = action.get("selector", "")
-        for sens_selector in policy.sensitive_selectors:
+        for needle in policy.sensitive_selector_needles:
             # Use simple matching for demo
-            if sens_selector.replace("[", "").replace("]", "") in selector:
+            if needle in selector:
                 return PolicyEvaluation(
                     decision=PolicyDecision.CONFIRM,
                     allowed=False,
@@ -272,8 +293,8 @@ class PolicyEngineService:
                 )
         
         # Check 5: Confirmation required actions
-        for confirm_action in policy.require_confirmation_for:
-            if confirm_action.lower() in action_text:
+        for confirm_action, needle in policy.confirmation_needles:
+            if needle in action_text:
                 return PolicyEvaluation(
                     decision=PolicyDecision.CONFIRM,
                     allowed=False,
@@ -295,22 +316,21 @@ class PolicyEngineService:
         """Check if domain is allowed"""
         try:
             # Extract domain from URL
-            from urllib.parse import urlparse
             parsed = urlparse(url)
             domain = parsed.netloc.lower()
             
             # Check blocked patterns
-            for pattern in policy.blocked_domains:
-                if fnmatch.fnmatch(domain, pattern.lower()):
+            for pattern, matcher in policy.blocked_domain_matchers:
+                if matcher.match(domain):
                     return {
                         "allowed": False,
                         "reason": f"Domain {domain} matches blocked pattern {pattern}"
                     }
             
             # Check allowed list (if specified)
-            if policy.allowed_domains:
-                for pattern in policy.allowed_domains:
-                    if fnmatch.fnmatch(domain, pattern.lower()):
+            if policy.allowed_domain_matchers:
+                for matcher in policy.allowed_domain_matchers:
+                    if matcher.match(domain):
                         return {"allowed": True, "reason": "Domain in allowlist"}
                 return {
                     "allowed": False,
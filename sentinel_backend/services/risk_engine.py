@@ -241,10 +241,12 @@ class RiskEngineService:
             latencyMs=latency_ms
         )
         
-        # Track history for forensics
+        return self.record(assessment)
+    
+    def record(self, assessment: RiskAssessment) -> RiskAssessment:
+        """Track an assessment in history for forensics and peak tracking"""
         self._history.append(assessment)
-        self._peak_score = max(self._peak_score, total_score)
-        
+        self._peak_score = max(self._peak_score, assessment.riskScore)
         return assessment
     
     def get_risk_evolution(self, last_n: int = 60) -> List[Dict]:
@@ -9,12 +9,19 @@ Required Events:
 - PAGE_LOADED       → Navigation complete
 - ACTION_ATTEMPTED  → Before decision
 - ACTION_DECISION   → Allow/Block/Confirm
+- ACTION_RESOLVED   → Attempt + decision in one event
 - THREAT_DETECTED   → Any detection
 - HONEY_PROMPT_TRIGGERED → Trap hit
 - RISK_UPDATE       → Score change
 - TRUST_UPDATE      → Trust recalculated
 - SESSION_TERMINATED → End
 
+Frames are sent only to the session's own connections, so they carry
+no sessionId; event history entries still include it. Each session has a
+single writer task that owns all sends, so concurrent emitters queue
+frames instead of interleaving on the socket. Screenshots only keep the
+newest unsent frame, so a slow client cannot build up a backlog.
+
 Every message includes standardized meta:
 {
     "meta": {
@@ -29,10 +36,13 @@ import time
 import asyncio
 import random
 import psutil
+from contextvars import ContextVar
 from typing import Dict, Any, List, Callable, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 
 
 class EventType(str, Enum):
@@ -48,6 +58,7 @@ class EventType(str, Enum):
     # Actions
     ACTION_ATTEMPTED = "ACTION_ATTEMPTED"
     ACTION_DECISION = "ACTION_DECISION"
+    ACTION_RESOLVED = "ACTION_RESOLVED"
     
     # Security
     THREAT_DETECTED = "THREAT_DETECTED"
@@ -80,15 +91,17 @@ class EventMeta:
     cpuLoad: str
     timestamp: float = field(default_factory=time.time)
     
-    def to_dict(self) -> Dict[str, Any]:
-        from datetime import datetime, timezone
+    def timestamp_iso(self) -> str:
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat()
+    
+    def to_dict(self, timestamp_iso: str = None) -> Dict[str, Any]:
         return {
             "latency_ms": self.latencyMs,
             "defcon": self.defconLevel,
             "cpu_load": self.cpuLoad,
             "timestamp": self.timestamp,
             # ISO 8601 format for judges
-            "timestamp_iso": datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat()
+            "timestamp_iso": timestamp_iso or self.timestamp_iso()
         }
 
 
@@ -100,15 +113,42 @@ class SentinelEvent:
     meta: EventMeta
     session_id: Optional[str] = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        from datetime import datetime, timezone
-        return {
+    def to_dict(self, include_session: bool = True) -> Dict[str, Any]:
+        # Event and meta share one timestamp, so format it once
+        timestamp_iso = self.meta.timestamp_iso()
+        event = {
             "type": self.type.value,
-            "sessionId": self.session_id,
-            "timestamp": datetime.fromtimestamp(self.meta.timestamp, tz=timezone.utc).isoformat(),
+            "timestamp": timestamp_iso,
             "payload": self.data,
-            "meta": self.meta.to_dict()
+            "meta": self.meta.to_dict(timestamp_iso)
         }
+        if include_session:
+            event["sessionId"] = self.session_id
+        return event
+
+
+# Frame types where only the newest unsent frame matters; they use a
+# latest-value slot instead of queueing every frame
+_LATEST_ONLY_TYPES = frozenset({EventType.SCREENSHOT.value})
+
+# Writer placeholder for "nothing taken from the queue yet"
+_NO_MESSAGE = object()
+
+
+@dataclass
+class _CoalesceBuffer:
+    """Frames held back by one coalesce() block"""
+    session_id: str
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    closed: bool = False
+
+
+# The coalesce() block of the running handler. Kept per context rather than
+# per session, so two handlers on one session_id (a reconnect mid-command)
+# each buffer and flush only their own frames.
+_coalesce_buffer: ContextVar[Optional[_CoalesceBuffer]] = ContextVar(
+    "sentinel_coalesce_buffer", default=None
+)
 
 
 class WebSocketOrchestratorService:
@@ -141,6 +181,12 @@ class WebSocketOrchestratorService:
         
         # Event handlers (for hooks)
         self._handlers: Dict[EventType, List[Callable]] = defaultdict(list)
+        
+        # Outgoing frames: session_id -> queue drained by that session's writer task
+        self._outbox: Dict[str, asyncio.Queue] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+        # session_id -> frame type -> newest unsent latest-only frame
+        self._latest: Dict[str, Dict[str, Dict[str, Any]]] = {}
     
     def register_connection(
         self,
@@ -150,6 +196,16 @@ class WebSocketOrchestratorService:
         """Register a WebSocket send function for session"""
         self._connections[session_id].append(send_func)
         
+        # One writer per session owns every send on its connections
+        if session_id not in self._outbox:
+            queue = asyncio.Queue()
+            latest = {}
+            self._outbox[session_id] = queue
+            self._latest[session_id] = latest
+            self._writers[session_id] = asyncio.get_running_loop().create_task(
+                self._writer(self._connections[session_id], queue, latest)
+            )
+        
         # Initialize session state
         if session_id not in self._session_state:
             self._session_state[session_id] = {
@@ -158,13 +214,34 @@ class WebSocketOrchestratorService:
                 "latency_count": 0
             }
     
-    def unregister_connection(self, session_id: str, send_func: Callable = None):
-        """Remove WebSocket connection"""
+    def unregister_connection(self, session_id: str, send_func: Callable = None) -> Optional[asyncio.Task]:
+        """
+        Remove WebSocket connection.
+        
+        When the session's last connection goes, returns its writer task;
+        awaiting it waits until already-queued frames are sent. The task
+        belongs to this registration, so a reconnect under the same
+        session_id cannot take it over.
+        """
         if send_func:
             if send_func in self._connections[session_id]:
                 self._connections[session_id].remove(send_func)
-        else:
-            self._connections.pop(session_id, None)
+            if self._connections[session_id]:
+                return None
+        
+        self._connections.pop(session_id, None)
+        
+        # Let the writer drain what is already queued, then exit
+        queue = self._outbox.pop(session_id, None)
+        if queue is None:
+            return None
+        self._latest.pop(session_id, None)
+        queue.put_nowait(None)
+        return self._writers.pop(session_id, None)
+    
+    def channel(self, session_id: str) -> "SessionChannel":
+        """WebSocket-like handle whose send_json goes through the session's writer"""
+        return SessionChannel(self, session_id)
     
     def _get_cpu_load(self) -> str:
         """Get current CPU load (or simulated)"""
@@ -234,15 +311,159 @@ class WebSocketOrchestratorService:
             except Exception as e:
                 print(f"[ORCHESTRATOR] Handler error: {e}")
         
-        # Send to all WebSockets for this session
-        message = event.to_dict()
-        for send_func in self._connections.get(session_id, []):
+        # Send to all WebSockets for this session. Connections are scoped to
+        # one session, so the frame omits sessionId (history keeps it).
+        message = event.to_dict(include_session=False)
+        if not self._buffer(session_id, message):
+            self.send_raw(session_id, message)
+        
+        return event
+    
+    def send_raw(self, session_id: str, message: Dict[str, Any]):
+        """Queue a frame for the session's writer (never blocks)"""
+        queue = self._outbox.get(session_id)
+        if queue is not None:
+            queue.put_nowait(message)
+    
+    def send_latest(self, session_id: str, message: Dict[str, Any]):
+        """
+        Queue a frame that replaces any unsent frame of the same type.
+        
+        The queue only holds the type as a placeholder, so a client that
+        reads slowly gets the newest frame instead of a backlog.
+        """
+        latest = self._latest.get(session_id)
+        if latest is None:
+            return
+        frame_type = message["type"]
+        if frame_type not in latest:
+            self._outbox[session_id].put_nowait(frame_type)
+        latest[frame_type] = message
+    
+    def send_frame(self, session_id: str, message: Dict[str, Any]):
+        """
+        Queue a frame built outside emit() (see SessionChannel).
+        
+        Inside a coalesce() block it is buffered with the events, so it
+        keeps its place among them.
+        """
+        if message.get("type") in _LATEST_ONLY_TYPES:
+            self.send_latest(session_id, message)
+        elif not self._buffer(session_id, message):
+            self.send_raw(session_id, message)
+    
+    async def _writer(
+        self,
+        connections: List[Callable],
+        queue: asyncio.Queue,
+        latest: Dict[str, Dict[str, Any]]
+    ):
+        """
+        Sole sender for a session's connections.
+        
+        Frames that queued up while a send was in flight go out together
+        as one {"batch": [...]} frame; latest-only frames (queued as their
+        type, see send_latest) are always sent on their own. Holding the
+        connection list keeps already-queued frames deliverable after
+        unregister_connection.
+        """
+        message = await queue.get()
+        while message is not None:
+            if isinstance(message, str):
+                await self._send(connections, latest.pop(message))
+                message = await queue.get()
+                continue
+            
+            events = list(message["batch"]) if "batch" in message else [message]
+            message = _NO_MESSAGE
+            while not queue.empty():
+                queued = queue.get_nowait()
+                if queued is None or isinstance(queued, str):
+                    # Stop, or a latest-only frame: send what we have first
+                    message = queued
+                    break
+                events.extend(queued["batch"] if "batch" in queued else (queued,))
+            
+            await self._send(connections, events[0] if len(events) == 1 else {"batch": events})
+            if message is _NO_MESSAGE:
+                message = await queue.get()
+    
+    async def _send(self, connections: List[Callable], message: Dict[str, Any]):
+        """Send one frame to every given WebSocket send function"""
+        for send_func in list(connections):
             try:
                 await send_func(message)
             except Exception as e:
                 print(f"[ORCHESTRATOR] Send error: {e}")
+    
+    @asynccontextmanager
+    async def coalesce(self, session_id: str):
+        """
+        Buffer events emitted for session until the block exits.
         
-        return event
+        Buffered events go out as one frame: a single event is sent
+        unchanged, several are wrapped as {"batch": [event, ...]}.
+        
+        Only events emitted from the current task (and tasks it starts)
+        are buffered; a nested block for the same session joins the
+        outer one.
+        """
+        outer = _coalesce_buffer.get()
+        if outer is not None and not outer.closed and outer.session_id == session_id:
+            yield
+            return
+        
+        buffer = _CoalesceBuffer(session_id)
+        token = _coalesce_buffer.set(buffer)
+        try:
+            yield
+        finally:
+            _coalesce_buffer.reset(token)
+            buffer.closed = True
+            self._flush_buffer(buffer)
+    
+    @asynccontextmanager
+    async def uncoalesced(self, session_id: str):
+        """
+        Send what coalesce() has buffered so far, and let frames through
+        unbuffered until the block exits.
+        
+        Wrap slow calls (browser RPCs) inside a coalesce block with this,
+        so earlier events are not held back for the whole call.
+        """
+        buffer = _coalesce_buffer.get()
+        if buffer is None or buffer.session_id != session_id:
+            yield
+            return
+        
+        self._flush_buffer(buffer)
+        token = _coalesce_buffer.set(None)
+        try:
+            yield
+        finally:
+            _coalesce_buffer.reset(token)
+    
+    async def flush(self, session_id: str):
+        """Send any events buffered by the current coalesce() block"""
+        buffer = _coalesce_buffer.get()
+        if buffer is not None and buffer.session_id == session_id:
+            self._flush_buffer(buffer)
+    
+    def _buffer(self, session_id: str, message: Dict[str, Any]) -> bool:
+        """Hold message in the current coalesce() block; False if not coalescing"""
+        buffer = _coalesce_buffer.get()
+        if buffer is None or buffer.closed or buffer.session_id != session_id:
+            return False
+        buffer.messages.append(message)
+        return True
+    
+    def _flush_buffer(self, buffer: _CoalesceBuffer):
+        messages = buffer.messages
+        if not messages:
+            return
+        
+        buffer.messages = []
+        self.send_raw(buffer.session_id, messages[0] if len(messages) == 1 else {"batch": messages})
     
     # ==========================================
     # CONVENIENCE EMISSION METHODS
@@ -305,6 +526,32 @@ class WebSocketOrchestratorService:
             }
         )
     
+    async def emit_action_resolved(
+        self,
+        session_id: str,
+        action_type: str,
+        target: str,
+        decision: str,  # ALLOW, BLOCK, FAILED
+        reason: str = None,
+        intent: str = None,
+        policy_rule: str = None,
+        latency_ms: int = None
+    ):
+        """Emit ACTION_RESOLVED (attempt and decision as a single event)"""
+        return await self.emit(
+            EventType.ACTION_RESOLVED,
+            session_id,
+            {
+                "actionType": action_type,
+                "target": target,
+                "intent": intent,
+                "decision": decision,
+                "reason": reason,
+                "policyRule": policy_rule
+            },
+            latency_ms
+        )
+    
     async def emit_threat_detected(
         self,
         session_id: str,
@@ -504,6 +751,23 @@ class WebSocketOrchestratorService:
         )
 
 
+class SessionChannel:
+    """
+    Stand-in for a WebSocket handed to code that sends frames directly.
+    
+    send_json queues onto the session's writer, so those frames are
+    ordered with orchestrator events instead of racing them (screenshots
+    keep only the newest unsent frame).
+    """
+    
+    def __init__(self, orchestrator: WebSocketOrchestratorService, session_id: str):
+        self._orchestrator = orchestrator
+        self._session_id = session_id
+    
+    async def send_json(self, data: Dict[str, Any]):
+        self._orchestrator.send_frame(self._session_id, data)
+
+
 # Singleton instance
 ws_orchestrator = WebSocketOrchestratorService()
 
@@ -520,5 +784,5 @@ def register_ws(session_id: str, send_func: Callable):
     ws_orchestrator.register_connection(session_id, send_func)
 
 
-def unregister_ws(session_id: str, send_func: Callable = None):
-    ws_orchestrator.unregister_connection(session_id, send_func)
+def unregister_ws(session_id: str, send_func: Callable = None) -> Optional[asyncio.Task]:
+    return ws_orchestrator.unregister_connection(session_id, send_func)
@@ -0,0 +1,88 @@
+"""
+model_construct() skips validation, so these check that the models built
+that way are the same as validating their own dump.
+"""
+import asyncio
+
+import pytest
+
+from sentinel_backend.browser_engine import SecureBrowser
+from sentinel_backend.metrics_engine import MetricsEngine
+from sentinel_backend.models import (
+    GlobalMetrics,
+    PolicyConfig,
+    PolicyEvaluation,
+    SessionConfig,
+    SessionMetrics,
+    WSEvent,
+    utc_timestamp,
+)
+from sentinel_backend.policy_engine import evaluate_action
+
+
+def assert_round_trips(model):
+    assert type(model).model_validate(model.model_dump()) == model
+
+
+@pytest.mark.parametrize("action, context", [
+    ({}, {}),
+    ({"type": "click", "selector": "#next"}, {"trust_score": 90, "session_id": "mc-clean"}),
+    ({"type": "login", "selector": "#submit"}, {"trust_score": 80, "session_id": "mc-confirm"}),
+])
+def test_policy_evaluation(action, context):
+    policy = PolicyConfig(blocked_domains=["evil.example"])
+    evaluation = evaluate_action(action, context, policy)
+    assert isinstance(evaluation, PolicyEvaluation)
+    assert_round_trips(evaluation)
+
+
+def test_policy_evaluation_with_violations():
+    evaluation = evaluate_action(
+        {"type": "payment", "amount": 500, "url": "https://evil.example/pay"},
+        {"trust_score": 20, "session_id": "mc-violations"},
+        PolicyConfig(blocked_domains=["evil.example"])
+    )
+    assert not evaluation.allowed
+    assert evaluation.violations
+    assert_round_trips(evaluation)
+
+
+def test_metrics_empty_engine():
+    engine = MetricsEngine()
+    assert engine.get_session_metrics("missing") is None
+    assert_round_trips(engine.get_global_metrics())
+
+
+@pytest.mark.parametrize("sorted_latencies", [True, False])
+def test_metrics_after_actions(sorted_latencies):
+    engine = MetricsEngine(sorted_latencies=sorted_latencies)
+    engine.start_session("s1")
+    engine.record_action("s1", allowed=True, blocked=False, latency_ms=1.5, risk_score=10.0)
+    engine.record_action("s1", allowed=False, blocked=True, latency_ms=3.0, risk_score=85.0, threats_detected=2)
+    engine.record_feedback("s1", is_true_positive=True, is_false_positive=True)
+    engine.start_session("s2")
+    
+    session = engine.get_session_metrics("s1")
+    assert isinstance(session, SessionMetrics)
+    assert_round_trips(session)
+    assert_round_trips(engine.get_session_metrics("s2"))
+    
+    totals = engine.get_global_metrics()
+    assert isinstance(totals, GlobalMetrics)
+    assert totals.total_actions == 2
+    assert_round_trips(totals)
+
+
+@pytest.mark.parametrize("data", [None, {}, {"url": "https://example.com", "title": "Example"}])
+def test_browser_ws_event(data):
+    events = []
+    
+    async def capture(event):
+        events.append(event)
+    
+    browser = SecureBrowser("s1", SessionConfig(target_url="https://example.com", task_goal="test"), capture)
+    asyncio.run(browser._emit_event("PAGE_LOADED", data))
+    
+    # The dump SecureBrowser sends validates back to itself
+    assert WSEvent.model_validate(events[0]).model_dump() == events[0]
+    assert_round_trips(WSEvent.model_construct(type="PAGE_LOADED", data=data or {}, timestamp=utc_timestamp()))
@@ -0,0 +1,82 @@
+import asyncio
+
+from sentinel_backend.services.ws_orchestrator import EventType, WebSocketOrchestratorService
+
+
+def _steps(frames):
+    """Flatten sent frames (batched or not) into their payload steps"""
+    steps = []
+    for frame in frames:
+        for event in frame.get("batch", [frame]):
+            steps.append(event["payload"]["step"])
+    return steps
+
+
+def test_overlapping_handlers_keep_their_own_buffer():
+    async def scenario():
+        orchestrator = WebSocketOrchestratorService()
+        frames = []
+        
+        async def send(message):
+            frames.append(message)
+        
+        orchestrator.register_connection("s1", send)
+        a_in_browser_call = asyncio.Event()
+        b_buffered = asyncio.Event()
+        a_done = asyncio.Event()
+        
+        async def emit(step):
+            await orchestrator.emit(EventType.DEMO_EVENT, "s1", data={"step": step})
+        
+        async def handler_a():
+            async with orchestrator.coalesce("s1"):
+                await emit("A1")
+                async with orchestrator.uncoalesced("s1"):
+                    a_in_browser_call.set()
+                    await b_buffered.wait()
+                await emit("A2")
+            a_done.set()
+        
+        async def handler_b():
+            # Same session_id, e.g. a reconnect while A is navigating
+            await a_in_browser_call.wait()
+            async with orchestrator.coalesce("s1"):
+                await emit("B1")
+                b_buffered.set()
+                await a_done.wait()
+                await asyncio.sleep(0)
+                # A exiting must not have sent B's buffered event
+                assert "B1" not in _steps(frames)
+                await emit("B2")
+        
+        await asyncio.gather(handler_a(), handler_b())
+        await orchestrator.unregister_connection("s1")
+        return frames
+    
+    frames = asyncio.run(scenario())
+    assert _steps(frames) == ["A1", "A2", "B1", "B2"]
+    # B's events left together when B's block exited
+    assert _steps(frames[-1:]) == ["B1", "B2"]
+
+
+def test_nested_coalesce_joins_outer_block():
+    async def scenario():
+        orchestrator = WebSocketOrchestratorService()
+        frames = []
+        
+        async def send(message):
+            frames.append(message)
+        
+        orchestrator.register_connection("s1", send)
+        async with orchestrator.coalesce("s1"):
+            await orchestrator.emit(EventType.DEMO_EVENT, "s1", data={"step": 1})
+            async with orchestrator.coalesce("s1"):
+                await orchestrator.emit(EventType.DEMO_EVENT, "s1", data={"step": 2})
+            await asyncio.sleep(0)
+            assert frames == []
+        await orchestrator.unregister_connection("s1")
+        return frames
+    
+    frames = asyncio.run(scenario())
+    assert len(frames) == 1
+    assert _steps(frames) == [1, 2]
@@ -5,16 +5,23 @@ Helpers, logging, timing, and common functions.
 """
 
 import time
+import json
 import hashlib
 import logging
 import asyncio
 from functools import wraps
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, Tuple
 from datetime import datetime
 import uuid
 import base64
 import re
 
+try:
+    import orjson
+except ImportError:
+    # Fallback to stdlib json if orjson not available
+    orjson = None
+
 
 # ============================================
 # LOGGING SETUP
@@ -153,6 +160,22 @@ def hash_dom(dom_tree: dict) -> str:
     return hash_content(content)
 
 
+def dumps_json(data: Any) -> str:
+    """Serialize to compact JSON, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def dumps_json_bytes(data: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, ready for an HTTP body"""
+    if orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
 def encode_base64(data: bytes) -> str:
     """Encode bytes to base64 string"""
     return base64.b64encode(data).decode('utf-8')
@@ -186,11 +209,8 @@ def extract_text_from_dom(dom_node: dict) -> str:
 
 def normalize_text(text: str) -> str:
     """Normalize text for comparison"""
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    # Convert to lowercase
-    text = text.lower().strip()
-    return text
+    # split()/join collapses whitespace runs and trims without the regex engine
+    return ' '.join(text.split()).lower()
 
 
 def extract_keywords(text: str) -> list:
@@ -311,9 +331,43 @@ def severity_to_score(severity: str) -> float:
 # TIMESTAMP HELPERS
 # ============================================
 
+# (whole epoch second, its "YYYY-MM-DDTHH:MM:SS" text), swapped as one tuple
+_iso_second_cache = (-1, "")
+
+
+def _iso_from_epoch(epoch: float) -> str:
+    """
+    Format an epoch like datetime.utcfromtimestamp(epoch).isoformat() + "Z".
+    
+    The date/time part only changes once a second, so it is formatted once
+    per second and reused; only the microseconds are formatted per call.
+    """
+    global _iso_second_cache
+    second = int(epoch)
+    # Same half-even rounding (and carry) as datetime.utcfromtimestamp
+    micros = round((epoch - second) * 1e6)
+    if micros >= 1_000_000:
+        second += 1
+        micros -= 1_000_000
+    
+    cached_second, prefix = _iso_second_cache
+    if second != cached_second:
+        prefix = datetime.utcfromtimestamp(second).isoformat()
+        _iso_second_cache = (second, prefix)
+    
+    # isoformat() omits the fraction entirely when it is zero
+    return f"{prefix}.{micros:06d}Z" if micros else prefix + "Z"
+
+
 def now_iso() -> str:
     """Get current UTC timestamp in ISO format"""
-    return datetime.utcnow().isoformat() + "Z"
+    return _iso_from_epoch(time.time())
+
+
+def now_iso_epoch() -> Tuple[str, float]:
+    """Get current UTC timestamp in ISO format along with its epoch seconds"""
+    epoch = time.time()
+    return _iso_from_epoch(epoch), epoch
 
 
 def timestamp_ms() -> int: